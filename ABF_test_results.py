@@ -1,80 +1,184 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from Data import pt_teams, random_game_dates_pt
-from charles import Population
-from mutation import swap_mutation, insertion_mutation, inversion_mutation, scramble_mutation, displacement_mutation
-from selection import rank_selection, fps, tournament_sel
-from xo import modified_order_xo, subtour_xo, order_xo, position_based_xo, two_point_xo, uniform_xo, geo_xo, cycle_xo, \
-    single_point_xo
-
-
-def run_evolutionary_algorithm(selection_func, crossover_func, mutation_func, elitism):
-    P = Population(size=50, optim="max", teams=pt_teams, sol_size=len(random_game_dates_pt),
-                   valid_set=pt_teams, repetition=False, elitism=elitism)
-
-    best_fitness, fitness_list = P.evolve(gens=200, xo_prob=0.9, mut_prob=0.2, select=selection_func,
-                                          mutate=mutation_func, crossover=crossover_func)
-
-    return best_fitness, fitness_list
-
-
-selection_functions = [fps, rank_selection, tournament_sel]
-crossover_functions = [single_point_xo, cycle_xo, two_point_xo, geo_xo, uniform_xo, position_based_xo, order_xo, subtour_xo, modified_order_xo]
-mutation_functions = [swap_mutation, inversion_mutation, insertion_mutation, scramble_mutation, displacement_mutation]
-elitism_options = [True, False]
-results = []
-num_runs = 30
-
-for elitism in elitism_options:
-    for selection_func in selection_functions:
-        for crossover_func in crossover_functions:
-            for mutation_func in mutation_functions:
-                print(f"Elitism: {elitism}, Selection: {selection_func.__name__}, Crossover: {crossover_func.__name__}, Mutation: {mutation_func.__name__}")
-                fitness_across_runs = []
-                for _ in range(num_runs):
-                    _, fitness_list = run_evolutionary_algorithm(selection_func, crossover_func, mutation_func, elitism)
-                    fitness_across_runs.append(fitness_list)
-                avg_fitness = np.mean(fitness_across_runs, axis=0)
-                std_dev_fitness = np.std(fitness_across_runs, axis=0)
-                results.append({
-                    'elitism': elitism,
-                    'selection_func': selection_func.__name__,
-                    'crossover_func': crossover_func.__name__,
-                    'mutation_func': mutation_func.__name__,
-                    'avg_fitness': avg_fitness,
-                    'std_dev_fitness': std_dev_fitness
-                })
-
-# Convert results to a DataFrame
-df = pd.DataFrame(results)
-
-df.to_excel('fitness_data.xlsx', index=False)
-
-
-# Function to plot fitness over generations
-def plot_fitness(df, group_by, title):
-    grouped = df.groupby(group_by)
-    plt.figure(figsize=(12, 8))
-    for name, group in grouped:
-        generations = np.arange(len(group.iloc[0]['avg_fitness']))
-        avg_fitness = np.mean(np.vstack(group['avg_fitness']), axis=0)
-        std_dev = np.mean(np.vstack(group['std_dev_fitness']), axis=0)
-        plt.plot(generations, avg_fitness, label=f'{name} (Mean)')
-        plt.fill_between(generations, avg_fitness - std_dev, avg_fitness + std_dev, alpha=0.2)
-
-    plt.xlabel('Generations')
-    plt.ylabel('Fitness')
-    plt.title(title)
-    plt.legend()
-    plt.show()
-
-
-# Plot aggregated by selection methods
-plot_fitness(df, 'selection_func', 'Fitness Over Generations Aggregated by Selection Methods')
-
-# Plot aggregated by crossover functions
-plot_fitness(df, 'crossover_func', 'Fitness Over Generations Aggregated by Crossover Functions')
-
-# Plot aggregated by mutation functions
-plot_fitness(df, 'mutation_func', 'Fitness Over Generations Aggregated by Mutation Functions')
+import argparse
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from Data import pt_teams, random_game_dates_pt
+from charles import Population
+from cache import FitnessCache
+from stopping import Stagnation
+from results import ResultsStore, PARTITION_KEYS
+from mutation import swap_mutation, insertion_mutation, inversion_mutation, scramble_mutation, displacement_mutation
+from selection import rank_selection, fps, tournament_sel
+from xo import modified_order_xo, subtour_xo, order_xo, position_based_xo, two_point_xo, uniform_xo, geo_xo, cycle_xo, \
+    single_point_xo
+
+
+# Shared by every run of a process, as all of them schedule the same league
+fitness_cache = FitnessCache()
+
+
+def run_evolutionary_algorithm(selection_func, crossover_func, mutation_func, elitism, observers=None, stop=None):
+    P = Population(size=50, optim="max", teams=pt_teams, sol_size=len(random_game_dates_pt),
+                   valid_set=pt_teams, repetition=False, elitism=elitism, cache=fitness_cache)
+
+    best_fitness, fitness_list = P.evolve(gens=200, xo_prob=0.9, mut_prob=0.2, select=selection_func,
+                                          mutate=mutation_func, crossover=crossover_func, observers=observers,
+                                          stop=stop)
+
+    return best_fitness, fitness_list
+
+
+selection_functions = [fps, rank_selection, tournament_sel]
+crossover_functions = [single_point_xo, cycle_xo, two_point_xo, geo_xo, uniform_xo, position_based_xo, order_xo, subtour_xo, modified_order_xo]
+mutation_functions = [swap_mutation, inversion_mutation, insertion_mutation, scramble_mutation, displacement_mutation]
+elitism_options = [True, False]
+num_runs = 30
+
+functions = {func.__name__: func for func in selection_functions + crossover_functions + mutation_functions}
+
+
+def grid_jobs(num_runs=num_runs, base_seed=0):
+    """Every (configuration, run) of the study, each with its own seed.
+
+    The seed depends only on the configuration, the run and base_seed, so a job
+    gives the same result whatever worker runs it and whenever it is run.
+
+    Returns:
+        list: Jobs as dicts with the configuration, the run number and the seed.
+    """
+    jobs = []
+    for elitism in elitism_options:
+        for selection_func in selection_functions:
+            for crossover_func in crossover_functions:
+                for mutation_func in mutation_functions:
+                    for run in range(num_runs):
+                        job = {
+                            'elitism': elitism,
+                            'selection_func': selection_func.__name__,
+                            'crossover_func': crossover_func.__name__,
+                            'mutation_func': mutation_func.__name__,
+                            'run': run,
+                        }
+                        job['seed'] = zlib.crc32(f"{base_seed}:{job_key(job)}".encode())
+                        jobs.append(job)
+    return jobs
+
+
+def job_key(job):
+    return f"{job['elitism']}/{job['selection_func']}/{job['crossover_func']}/{job['mutation_func']}/{job['run']}"
+
+
+def run_job(job, patience=None):
+    """Run one job of the grid in a worker process, stopping after patience generations without improvement."""
+    random.seed(job['seed'])
+    stop = [Stagnation(patience)] if patience else None
+    best_fitness, fitness_list = run_evolutionary_algorithm(functions[job['selection_func']], functions[job['crossover_func']],
+                                                            functions[job['mutation_func']], job['elitism'], observers=[],
+                                                            stop=stop)
+    return dict(job, best_fitness=best_fitness, fitness_list=fitness_list)
+
+
+def run_grid(jobs, store, workers=None, patience=None):
+    """Run the jobs of the grid in a process pool, persisting every run as soon as it finishes.
+
+    Runs already in the store are skipped, so an interrupted grid resumes
+    where it stopped. Finished runs are not kept in memory.
+
+    Args:
+        jobs (list): Jobs from grid_jobs.
+        store (ResultsStore): Store the finished runs are appended to, see results.py.
+        workers (int): Number of worker processes, one per CPU by default.
+        patience (int): Stop a run after this many generations without improvement, None to run all generations.
+
+    Returns:
+        ResultsStore: The store.
+    """
+    done_keys = store.keys(job_key)
+    pending = [job for job in jobs if job_key(job) not in done_keys]
+    print(f"{len(jobs) - len(pending)} runs already done, {len(pending)} to go")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_job, job, patience) for job in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            store.append(result)
+            print(f"[{done}/{len(pending)}] Elitism: {result['elitism']}, Selection: {result['selection_func']}, "
+                  f"Crossover: {result['crossover_func']}, Mutation: {result['mutation_func']}, "
+                  f"Run: {result['run']}, Best fitness: {result['best_fitness']}")
+
+    return store
+
+
+def summarize(store, **filters):
+    """Average and standard deviation of the fitness of every generation, per configuration.
+
+    Configurations are read from the store one at a time. Runs that stopped
+    early keep their last fitness for the generations they did not run.
+
+    Args:
+        store (ResultsStore): Store of the runs.
+        **filters: Only summarize the configurations matching these partition fields, e.g. selection_func="fps".
+    """
+    results = []
+    generations = store.runs(**filters)['length'].max()
+    for config, _, series in store.read(**filters):
+        fitness_across_runs = [np.pad(fitness, (0, generations - len(fitness)), mode='edge') for fitness in series]
+        results.append(dict(config,
+                            avg_fitness=np.mean(fitness_across_runs, axis=0),
+                            std_dev_fitness=np.std(fitness_across_runs, axis=0)))
+    return pd.DataFrame(results)
+
+
+def long_format(df):
+    """One row per configuration and generation, with plain float columns, for CSV output."""
+    df = df.explode(['avg_fitness', 'std_dev_fitness'])
+    df.insert(len(PARTITION_KEYS), 'generation', df.groupby(level=0).cumcount())
+    return df.astype({'avg_fitness': float, 'std_dev_fitness': float}).reset_index(drop=True)
+
+
+# Function to plot fitness over generations
+def plot_fitness(df, group_by, title):
+    grouped = df.groupby(group_by)
+    plt.figure(figsize=(12, 8))
+    for name, group in grouped:
+        generations = np.arange(len(group.iloc[0]['avg_fitness']))
+        avg_fitness = np.mean(np.vstack(group['avg_fitness']), axis=0)
+        std_dev = np.mean(np.vstack(group['std_dev_fitness']), axis=0)
+        plt.plot(generations, avg_fitness, label=f'{name} (Mean)')
+        plt.fill_between(generations, avg_fitness - std_dev, avg_fitness + std_dev, alpha=0.2)
+
+    plt.xlabel('Generations')
+    plt.ylabel('Fitness')
+    plt.title(title)
+    plt.legend()
+    plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the elitism/selection/crossover/mutation study.")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--runs", type=int, default=num_runs, help="runs per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the runs")
+    parser.add_argument("--results", default="fitness_runs", help="directory the finished runs are saved to")
+    parser.add_argument("--patience", type=int, default=None,
+                        help="stop a run after this many generations without improvement (default: run all 200)")
+    args = parser.parse_args()
+
+    store = run_grid(grid_jobs(args.runs, args.seed), ResultsStore(args.results), args.workers, args.patience)
+
+    # Convert results to a DataFrame
+    df = summarize(store)
+
+    long_format(df).to_csv('fitness_data.csv', index=False)
+
+    # Plot aggregated by selection methods
+    plot_fitness(df, 'selection_func', 'Fitness Over Generations Aggregated by Selection Methods')
+
+    # Plot aggregated by crossover functions
+    plot_fitness(df, 'crossover_func', 'Fitness Over Generations Aggregated by Crossover Functions')
+
+    # Plot aggregated by mutation functions
+    plot_fitness(df, 'mutation_func', 'Fitness Over Generations Aggregated by Mutation Functions')
@@ -1,4 +1,8 @@
 from datetime import datetime, timedelta
+import csv
+import hashlib
+import json
+import os
 import random
 
 teams = ['A', 'B', 'C', 'D', 'E', 'F']
@@ -21,54 +25,126 @@ valid_set = [[team1, team2] for team1 in teams for team2 in teams if team1 != te
 
 valid_set_pt = [[team1, team2] for team1 in pt_teams for team2 in pt_teams if team1 != team2]
 
+# Classic matches (both home and away) that should be scheduled on prime time
+CLASSICS = [('Sporting', 'Benfica'), ('Benfica', 'Sporting'), ('Sporting', 'Porto'), ('Porto', 'Sporting'), ('Porto', 'Benfica'), ('Benfica', 'Porto')]
+
 # Number of games n*(n-1)
 # 6 teams --> 30 games
 
 
-# Define the start date and end date of the two-month period
-#start_date = datetime(2024, 5, 1)  # May 1, 2024
-#end_date = datetime(2024, 9, 30)   # September 30, 2024
-
-start_date_pt = datetime(2024, 9, 1)  # May 1, 2024
-end_date_pt = datetime(2025, 7, 30)   # September 30, 2024
-
-# Initialize a list to store the game dates
-#game_dates = []
-game_dates_pt = []
+# Season the Portuguese calendar (random_game_dates_pt) was drawn from, see build_calendar
+start_date_pt = datetime(2024, 9, 1)  # September 1, 2024
+end_date_pt = datetime(2025, 7, 30)   # July 30, 2025
 
-# Define the days of the week for the games (, Saturday, Sunday)
-#game_days = [5, 6]  # Saturday, Sunday
+# Define the days of the week for the games (Saturday, Sunday)
 game_days_pt = [5, 6]
 
-# Define the start time and end time for the games (in hours)
-#start_time = 20  # 8:00 PM
+# Define the kickoff time of the games (in hours)
 start_time_pt = 20  # 8:00 PM
 
+# Compiled calendars are cached here, keyed by their parameters
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".calendar_cache")
+
+
+def build_calendar(start, end, match_days, kickoff, teams, seed=0, cache_dir=CACHE_DIR):
+    """Draw the kickoff dates of a double round-robin season.
+
+    Every match day between start and end (inclusive) is a candidate date,
+    and one date per match, n * (n - 1) for n teams, is drawn at random and
+    sorted. The result is cached on disk, so a calendar is only built once.
+
+    Args:
+        start (datetime or str): First day of the season, e.g. "2024-09-01".
+        end (datetime or str): Last day of the season.
+        match_days (list): Weekdays with games (Monday is 0, Saturday 5, Sunday 6).
+        kickoff (int or str): Kickoff time, as an hour or as "HH:MM".
+        teams (list): Team names of the league.
+        seed (int): Seed of the draw of the dates.
+        cache_dir (str): Directory of the cache, None to disable it.
+
+    Returns:
+        list: The sorted kickoff datetimes.
+    """
+    start, end = _date(start), _date(end)
+    hour, minute = (kickoff, 0) if isinstance(kickoff, int) else map(int, kickoff.split(":"))
+    n_games = len(teams) * (len(teams) - 1)
+
+    params = json.dumps([start.date().isoformat(), end.date().isoformat(), sorted(match_days), hour, minute, n_games, seed])
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f"calendar-{hashlib.sha1(params.encode()).hexdigest()[:16]}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                return [datetime.fromisoformat(date) for date in json.load(f)]
+
+    # Loop through the dates of the season
+    game_dates = []
+    current_date = start
+    while current_date <= end:
+        if current_date.weekday() in match_days:
+            game_dates.append(datetime(current_date.year, current_date.month, current_date.day, hour, minute))
+        current_date += timedelta(days=1)
+    if len(game_dates) < n_games:
+        raise ValueError(f"The season has {len(game_dates)} match dates but {n_games} games to schedule")
+
+    # Randomly select one date per game and order them
+    calendar = sorted(random.Random(seed).sample(game_dates, n_games))
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump([date.isoformat() for date in calendar], f)
+        os.replace(temporary, path)
+    return calendar
+
+
+def load_league(path, cache_dir=CACHE_DIR):
+    """Load a league and its calendar from a JSON or CSV file.
+
+    A JSON file holds the teams, optionally the classics, and either the
+    kickoff dates or the parameters of build_calendar:
+
+        {"teams": ["Porto", "Benfica", ...],
+         "classics": [["Porto", "Benfica"], ["Benfica", "Porto"]],
+         "calendar": {"start": "2024-09-01", "end": "2025-07-30", "match_days": [5, 6], "kickoff": "20:00", "seed": 0}}
+
+    or "dates": ["2024-09-01T20:00", ...] instead of "calendar".
+
+    A CSV file has a "team" column and a "kickoff" column, with one team or
+    kickoff datetime per row (cells of the shorter column are left empty), and
+    optionally "classic_home" and "classic_away" columns.
 
-# Loop through the dates in the two-month period
-current_date_pt = start_date_pt
-while current_date_pt <= end_date_pt:
-    # Check if the current date is a Friday, Saturday, or Sunday
-    if current_date_pt.weekday() in game_days_pt:
-        # Generate game times between start_time and end_time with 1-hour interval
-        game_time_pt = datetime(current_date_pt.year, current_date_pt.month, current_date_pt.day, start_time_pt)
-        game_dates_pt.append(game_time_pt)  # Adding the game time to game_dates
-    # Move to the next day
-    current_date_pt += timedelta(days=1)
+    Args:
+        path (str): The JSON or CSV file.
+        cache_dir (str): Cache directory for build_calendar.
 
-# Randomly select 30 game dates
-random_game_dates_pt = random.sample(game_dates_pt, (len(pt_teams)*(len(pt_teams)-1)))
+    Returns:
+        dict: "teams", "game_dates" and "classics" of the league, as expected by ProblemInstance.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        teams = [row["team"] for row in rows if row.get("team")]
+        game_dates = sorted(datetime.fromisoformat(row["kickoff"]) for row in rows if row.get("kickoff"))
+        classics = [(row["classic_home"], row["classic_away"]) for row in rows if row.get("classic_home")]
+    else:
+        with open(path, encoding="utf-8") as f:
+            league = json.load(f)
+        teams = league["teams"]
+        classics = [tuple(classic) for classic in league.get("classics", [])]
+        if "dates" in league:
+            game_dates = sorted(datetime.fromisoformat(date) for date in league["dates"])
+        else:
+            game_dates = build_calendar(teams=teams, cache_dir=cache_dir, **league["calendar"])
+    return {"teams": teams, "game_dates": game_dates, "classics": classics or list(CLASSICS)}
 
-# Order the games
-random_game_dates_pt.sort()
 
-# Print the list of game dates
-for game_date_pt in random_game_dates_pt:
-    print(game_date_pt)
+def _date(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
 
-print(len(random_game_dates_pt))
 
-# Create a list with the dates generated by the previous code
+# Calendars drawn with the previous code
 
 random_game_dates = [
     datetime(2024, 5, 4, 20, 0),
@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from statistics import median
+from Data import teams, pt_teams, random_game_dates, random_game_dates_pt, build_calendar
+from charles import Individual, Population
+from problem import ProblemInstance
+from selection import fps, rank_selection, tournament_sel, selection_table
+from mutation import swap_mutation, insertion_mutation, inversion_mutation, scramble_mutation, displacement_mutation
+from xo import single_point_xo, cycle_xo, pmx, two_point_xo, geo_xo, uniform_xo, position_based_xo, order_xo, \
+    subtour_xo, modified_order_xo
+
+selection_functions = [fps, rank_selection, tournament_sel]
+crossover_functions = [single_point_xo, cycle_xo, pmx, two_point_xo, geo_xo, uniform_xo, position_based_xo, order_xo,
+                       subtour_xo, modified_order_xo]
+mutation_functions = [swap_mutation, inversion_mutation, insertion_mutation, scramble_mutation, displacement_mutation]
+
+LEAGUE_SIZES = [6, 10, 18, 20]
+POPULATION_SIZES = [20, 50, 100]
+# Largest noise of one report that widens the threshold of a benchmark, see compare
+MAX_NOISE = 0.5
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+def league(n_teams):
+    """The problem of a league of n_teams teams.
+
+    6 and 10 teams are the leagues of Data.py with their calendars; other sizes
+    extend the Portuguese league with numbered teams and draw a calendar with
+    a game every day of the season.
+    """
+    if n_teams == len(teams):
+        return ProblemInstance.get(teams, random_game_dates)
+    if n_teams == len(pt_teams):
+        return ProblemInstance.get(pt_teams, random_game_dates_pt)
+    names = (pt_teams + [f"Team {i + 1}" for i in range(len(pt_teams), n_teams)])[:n_teams]
+    return ProblemInstance.get(names, build_calendar("2024-07-01", "2025-08-31", range(7), 20, names))
+
+
+def reference_time():
+    """Seconds of a fixed pure-Python workload, timed after every round of a benchmark to normalize it."""
+    start = time.perf_counter()
+    counts = {}
+    for i in range(20000):
+        counts[i % 97] = counts.get(i % 97, 0) + i
+    sorted(counts.items(), key=lambda item: item[1])
+    return time.perf_counter() - start
+
+
+def measure(func, repeat=5, min_time=0.05):
+    """Time repeat rounds of enough calls of func to last min_time.
+
+    The rounds that find how many calls that takes are not counted, as they include warming up.
+
+    Returns:
+        list: (seconds per call, reference_time right after) of every round.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append(((time.perf_counter() - start) / number, reference_time()))
+    return rounds
+
+
+def move_time(individual, mutate, number):
+    """Seconds per mutation and fitness update of an individual that holds a FitnessState.
+
+    The state is built again, outside the timing, whenever a move too large
+    to score incrementally dropped it (see Individual.apply_move), so every
+    call times what the move costs to an individual in a local search.
+    """
+    total = 0
+    for _ in range(number):
+        if individual._state is None:
+            individual.move_delta({})
+        start = time.perf_counter()
+        mutate(individual).fitness
+        total += time.perf_counter() - start
+    return total / number
+
+
+def micro_benchmarks(problem, population_sizes, repeat=5, min_time=0.05):
+    """Time the fitness function, every crossover, mutation and selection on one league.
+
+    Returns:
+        dict: Seconds per call and reference time of every round of every benchmark, by name, see measure.
+    """
+    results = {}
+    prefix = f"micro/teams={problem.n_teams}"
+    individual = Individual(problem=problem)
+    other = Individual(problem=problem)
+
+    results[f"{prefix}/get_fitness"] = measure(individual.get_fitness, repeat, min_time)
+
+    for crossover in crossover_functions:
+        results[f"{prefix}/xo/{crossover.__name__}"] = measure(lambda: crossover(individual, other), repeat, min_time)
+
+    # The operators alone: the offspring of evolve are mutated without an incremental state, and rescored in full
+    for mutate in mutation_functions:
+        results[f"{prefix}/mutation/{mutate.__name__}"] = measure(lambda: mutate(individual), repeat, min_time)
+
+    # A mutation and the new fitness on an individual holding a FitnessState, as in a local search
+    for mutate in mutation_functions:
+        results[f"{prefix}/delta/{mutate.__name__}"] = [(move_time(individual, mutate, number=200), reference_time())
+                                                       for _ in range(repeat)]
+
+    for size in population_sizes:
+        population = Population(size=size, teams=problem.teams, problem=problem)
+        for member in population:
+            member.fitness
+        for select in selection_functions:
+            name = f"{prefix}/size={size}/selection/{select.__name__}"
+            results[name] = measure(lambda: select(population), repeat, min_time)
+            # A whole generation of parents drawn from one selection table, as Population.evolve does
+            results[f"{name}/generation"] = measure(lambda: selection_table(select, population)(size), repeat, min_time)
+    return results
+
+
+def macro_benchmarks(problem, population_sizes, gens=5, repeat=3):
+    """Time Population.evolve on one league.
+
+    Returns:
+        dict: Seconds per generation and reference time of every round for every population size, by name.
+    """
+    results = {}
+    for size in population_sizes:
+        def run():
+            population = Population(size=size, teams=problem.teams, problem=problem, elitism=True)
+            population.evolve(gens=gens, xo_prob=0.9, mut_prob=0.2, select=tournament_sel,
+                              mutate=swap_mutation, crossover=modified_order_xo, observers=[])
+
+        results[f"macro/teams={problem.n_teams}/size={size}/evolve"] = [
+            (seconds / gens, reference) for seconds, reference in measure(run, repeat, min_time=0)]
+    return results
+
+
+def run_benchmarks(league_sizes=LEAGUE_SIZES, population_sizes=POPULATION_SIZES, macro=True, micro=True,
+                   repeat=5, min_time=0.05, gens=5, seed=0):
+    """Run the benchmark suite.
+
+    Args:
+        league_sizes (list): Numbers of teams of the leagues to benchmark.
+        population_sizes (list): Population sizes for selection and evolve.
+        macro (bool): Whether to time Population.evolve.
+        micro (bool): Whether to time the fitness function and the operators.
+        repeat (int): Rounds of every micro benchmark; the best round is kept and all of them give its noise.
+        min_time (float): Minimum duration of a round of a micro benchmark, in seconds.
+        gens (int): Generations of every evolve run.
+        seed (int): Seed of the random module.
+
+    Returns:
+        dict: "meta" with the environment of the run, "results" with the seconds per call of every benchmark
+        (its best round), "relative" with that time over the best reference time of its rounds, and "noise"
+        with the relative gap between its median and best rounds.
+    """
+    random.seed(seed)
+    rounds = {}
+    for n_teams in league_sizes:
+        problem = league(n_teams)
+        if micro:
+            rounds.update(micro_benchmarks(problem, population_sizes, repeat, min_time))
+        if macro:
+            rounds.update(macro_benchmarks(problem, population_sizes, gens, max(1, repeat // 2)))
+    meta = {"date": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "machine": platform.machine(), "platform": platform.platform(), "seed": seed}
+    seconds = {name: [seconds for seconds, _ in times] for name, times in rounds.items()}
+    return {"meta": meta, "results": {name: min(times) for name, times in seconds.items()},
+            "relative": {name: min(seconds[name]) / min(reference for _, reference in times)
+                         for name, times in rounds.items()},
+            "noise": {name: median(times) / min(times) - 1 for name, times in seconds.items()}}
+
+
+def delta_speedups(results):
+    """Time of every mutation with its fitness update, relative to the mutation followed by a full get_fitness.
+
+    Returns:
+        list: (name, rescoring seconds, delta seconds, ratio) of every delta benchmark; a ratio below 1 means
+        the incremental update beats rescoring. Moves too large for it are rescored, so their ratio is about 1.
+    """
+    rows = []
+    for name, seconds in results.items():
+        prefix, layer, mutation = name.rsplit("/", 2)
+        rescoring = [f"{prefix}/get_fitness", f"{prefix}/mutation/{mutation}"]
+        if layer == "delta" and all(key in results for key in rescoring):
+            full = sum(results[key] for key in rescoring)
+            rows.append((name, full, seconds, seconds / full))
+    return rows
+
+
+def compare(report, baseline, tolerance=0.25):
+    """Compare a benchmark report against a baseline report.
+
+    Benchmarks are compared by their time relative to the reference time of
+    their own rounds, so a machine running faster or slower than when the
+    baseline was stored, for good or while one benchmark runs, shows no change. A
+    benchmark regresses when its ratio to the baseline is over 1 + tolerance,
+    widened by the noise of both measurements (up to MAX_NOISE each).
+
+    Args:
+        report (dict): As returned by run_benchmarks.
+        baseline (dict): A report stored earlier; without relative times, the seconds are compared.
+        tolerance (float): Allowed relative slowdown of a noiseless benchmark.
+
+    Returns:
+        list: (name, baseline seconds, seconds, ratio, threshold) of every benchmark of both, slowest ratio first.
+    """
+    key = "relative" if "relative" in baseline else "results"
+    rows = []
+    for name, seconds in report["results"].items():
+        if baseline["results"].get(name):
+            ratio = report[key][name] / baseline[key][name]
+            noise = sum(min(MAX_NOISE, source.get("noise", {}).get(name, 0)) for source in (report, baseline))
+            rows.append((name, baseline["results"][name], seconds, ratio, (1 + tolerance) * (1 + noise)))
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def confirm(rows, baseline, args):
+    """Measure the benchmarks over their threshold again, up to args.confirm times.
+
+    A benchmark only counts as a regression if it stays over its threshold in
+    every run, so a burst of load on the machine cannot fail the comparison.
+
+    Returns:
+        list: The rows, with the lowest ratio measured for every benchmark measured again.
+    """
+    for _ in range(args.confirm):
+        suspects = {row[0] for row in rows if row[3] > row[4]}
+        if not suspects:
+            break
+        layers = {name.split("/")[0] for name in suspects}
+        rerun = run_benchmarks(sorted({int(name.split("/")[1].split("=")[1]) for name in suspects}), args.sizes,
+                               macro="macro" in layers, micro="micro" in layers, repeat=args.repeat, gens=args.gens,
+                               seed=args.seed)
+        again = {row[0]: row for row in compare(rerun, baseline, args.tolerance)}
+        rows = [min(row, again[row[0]], key=lambda row: row[3]) if row[0] in suspects and row[0] in again else row
+                for row in rows]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fitness function, the operators and evolve.")
+    parser.add_argument("--teams", type=int, nargs="+", default=LEAGUE_SIZES, help="League sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=POPULATION_SIZES, help="Population sizes.")
+    parser.add_argument("--only", choices=["micro", "macro"], help="Run one layer of the suite.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--gens", type=int, default=5, help="Generations of every evolve run.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown of a noiseless benchmark before it counts as a regression.")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="Times a benchmark over its threshold is measured again before it counts as a regression.")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.teams, args.sizes, macro=args.only != "micro", micro=args.only != "macro",
+                            repeat=args.repeat, gens=args.gens, seed=args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for name, full, delta, ratio in delta_speedups(report["results"]):
+        print(f"{name:60} {full * 1e6:12.1f} us {delta * 1e6:12.1f} us {ratio:7.2f}x rescoring")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {len(report['results'])} benchmarks to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = 0
+        for name, before, after, ratio, threshold in confirm(compare(report, baseline, args.tolerance), baseline, args):
+            flag = "REGRESSION" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"{name:60} {before * 1e6:12.1f} us {after * 1e6:12.1f} us {ratio:7.2f}x / {threshold:5.2f}x {flag}")
+        print(f"{regressions} regressions over their threshold (1 + {args.tolerance:.2f} and the noise of both runs), "
+              f"times relative to the reference time of their rounds")
+        sys.exit(1 if regressions else 0)
+    else:
+        for name, seconds in report["results"].items():
+            print(f"{name:60} {seconds * 1e6:12.1f} us")
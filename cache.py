@@ -0,0 +1,53 @@
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class FitnessCache:
+    """Memo of fitness values keyed by genome, with least-recently-used eviction.
+
+    Genomes are keyed by their raw bytes, which Python hashes quickly and which
+    never collide. A cache can be shared by several populations, across
+    generations and runs, as long as they all schedule the same league on the
+    same calendar.
+
+    Args:
+        maxsize (int): Maximum number of genomes to remember.
+    """
+
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, genome):
+        """Return the cached fitness of a genome, or None if it is not cached."""
+        key = genome.tobytes()
+        fitness = self._entries.get(key)
+        if fitness is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return fitness
+
+    def put(self, genome, fitness):
+        """Remember the fitness of a genome, evicting the least recently used one when full."""
+        key = genome.tobytes()
+        self._entries[key] = fitness
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def info(self):
+        """Hit and miss counters, in the style of functools.lru_cache."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
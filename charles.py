@@ -1,237 +1,626 @@
-from random import choice, sample, random, uniform
-from Data import teams, random_game_dates, random_game_dates_pt
+from random import choice, sample, random, uniform, getstate, setstate
+from Data import teams
 from operator import attrgetter
 from copy import copy
+from heapq import heapify, heappop, heappush
 from random import sample
 from datetime import datetime
+from array import array
+from genome import GENOME_TYPECODE, match_id, encode, decode
+from problem import ProblemInstance
+from constraints import score
+from delta import FitnessState, MAX_DELTA_POSITIONS
+from selection import selection_table
+from seeding import shuffled_genome, seed_genomes
+from profiling import EvolveStats, NO_STATS
+from observers import ConsoleObserver
+from elites import TopK
+from checkpoint import write_checkpoint, read_checkpoint, operator_name, resolve_operator
 
 class Individual:
-    def __init__(self, representation=None, teams=None, repetition=False):
-        self.teams = teams
-        self.size = len(teams) * (len(teams) - 1)
+    __slots__ = ("problem", "genome", "_fitness", "_state")
+
+    def __init__(self, representation=None, teams=None, repetition=False, problem=None):
+        # All individuals of a league share its compiled ProblemInstance
+        self.problem = ProblemInstance.get(teams) if problem is None else problem
+        self._fitness = None
+        self._state = None
 
         if representation is None:
             if repetition:
-                self.representation = [[team1, team2] for team1 in teams for team2 in teams if team1 != team2]
+                self.genome = array(GENOME_TYPECODE, range(self.size))
             else:
-                self.representation = []
-                while len(self.representation) < self.size:
-                    match = sample(teams, 2)
-                    if match not in self.representation:
-                        self.representation.append(match)
+                self.genome = shuffled_genome(self.teams)
         else:
-            self.representation = representation
+            self.genome = encode(representation, self.teams)
+
+    @property
+    def teams(self):
+        return self.problem.teams
+
+    @property
+    def fitness(self):
+        """Fitness of the schedule, computed on first access and cached until the genome changes."""
+        if self._fitness is None:
+            self._fitness = self.get_fitness()
+        return self._fitness
+
+    @fitness.setter
+    def fitness(self, fitness):
+        self._fitness = fitness
+
+    def copy(self):
+        """Copy the individual, keeping its cached fitness."""
+        individual = object.__new__(Individual)
+        individual.problem = self.problem
+        individual.genome = self.genome[:]
+        individual._fitness = self._fitness
+        individual._state = None if self._state is None else self._state.copy(individual.genome)
+        return individual
+
+    def overwrite(self, genes):
+        """Write new genes into the genome in place, dropping the cached fitness.
+
+        Args:
+            genes: Match IDs, an array or any sequence, of the same length as the genome.
+        """
+        self.genome[:] = genes if isinstance(genes, array) else array(GENOME_TYPECODE, genes)
+        self._fitness = None
+        self._state = None
+
+    def assign(self, other):
+        """Make the individual an in-place copy of another one, keeping its cached fitness.
+
+        Unlike copy, the incremental fitness state is not copied, see apply_move.
+        """
+        self.genome[:] = other.genome
+        self._fitness = other._fitness
+        self._state = None
+
+    @property
+    def size(self):
+        return self.problem.n_matches
 
-        # Include random_game_dates here when calling create_game_date_mapping
-        self.random_game_dates = random_game_dates_pt
+    @property
+    def representation(self):
+        """The schedule as a list of [home, away] pairs, decoded from the genome."""
+        return decode(self.genome, self.teams)
 
-        self.game_date_mapping = self.create_game_date_mapping(self.random_game_dates)
-        self.fitness = self.get_fitness()
+    @representation.setter
+    def representation(self, representation):
+        self.genome = encode(representation, self.teams)
+        self._fitness = None
+        self._state = None
 
     def __len__(self):
-        return len(self.representation)
+        return len(self.genome)
 
     def __getitem__(self, position):
-        return self.representation[position]
+        return self.genome[position]
 
     def __setitem__(self, position, value):
-        self.representation[position] = value
+        self._fitness = None
+        self._state = None
+        if isinstance(position, slice):
+            self.genome[position] = encode(value, self.teams)
+        else:
+            self.genome[position] = match_id(value, self.teams)
 
-    def __repr__(self):
-        return f" Fitness: {self.fitness}"
+    def apply_move(self, changes):
+        """Apply a local move, updating the fitness incrementally when that is cheaper than rescoring.
 
-    def create_game_date_mapping(self, random_game_dates_pt):
-        game_date_mapping = {}
-        for i, game in enumerate(self.representation):
-            game_date_mapping[str(game)] = random_game_dates_pt[i]
-        return game_date_mapping
+        A move of at most delta.MAX_DELTA_POSITIONS positions on an individual
+        that already has a FitnessState (see move_delta, e.g. in a local search)
+        only rescores the teams and date slots it touches. Any other move is
+        written into the genome and the fitness is computed again on next
+        access, as building the state costs about two full scorings.
 
-    def get_fitness(self):
+        Args:
+            changes (dict): New match ID of every position the move changes.
         """
-            Calculate the fitness of an individual representation for the scheduling problem.
-
-            This function evaluates the fitness of a schedule based on several hard and soft constraints.
-            The higher the fitness value, the better the schedule satisfies the given constraints.
-
-            Hard Constraints:
-            1. All teams must play against each other twice (once at home and once away).
-               - Penalize if any pair of teams does not meet this condition.
-            2. No team should play more than two consecutive away games.
-               - Penalize if a team plays more than two away games in a row.
-            3. No team should play more than one game in one weekend.
-               - Penalize if a team plays two games with less than a 2-day gap.
-
-            Soft Constraints:
-            1. Classic matches (e.g., Sporting vs. Benfica) should be scheduled on prime time (Saturdays).
-               - Reward if a classic match is on a Saturday.
-               - Penalize if a classic match is not on a Saturday.
-            2. Balance the number of games played on Saturdays and Sundays for each team.
-               - Reward schedules that have a balanced ratio of Saturday to Sunday games for each team.
-            3. Ensure no two classic matches occur within a weekend interval, but benefit if there is a week interval.
-               - Reward if there is a weekend pause between classic matches.
-               - Smaller reward if classic matches have a one-week interval.
-
-            Returns:
-                int: The calculated fitness value of the individual representation.
-            """
-        fitness = 0
-        matches = {team: [] for team in self.teams}
-
-        # Collect matches for each team
-        for game in self.representation:
-            matches[game[0]].append(game)
-            matches[game[1]].append(game)
-
-        # Check if all teams play together twice (once at home and once away)
-        pairs_count = {}
-        for game in self.representation:
-            pair = tuple(sorted(game))
-            if pair not in pairs_count:
-                pairs_count[pair] = 0
-            pairs_count[pair] += 1
-
-        for count in pairs_count.values():
-            if count != 2:
-                fitness -= 10  # Penalize for not meeting the condition
-
-        # Check if no team plays more than two consecutive away games
-        for team, games in matches.items():
-            away_streak = 0
-            for game in games:
-                if game[1] == team:  # Away game
-                    away_streak += 1
-                    if away_streak > 2:
-                        fitness -= 10  # Penalize for more than two consecutive away games
-                else:
-                    away_streak = 0
-
-
-        # Check if no team plays more than once in one wekeend
-        for team, games in matches.items():
-            game_dates = [self.game_date_mapping[str(game)] for game in games]
-            for i in range(len(game_dates) - 1):
-                if abs((game_dates[i + 1] - game_dates[i]).days) < 2:
-                    fitness -= 10  # Penalize for not meeting the 5-game interval condition
-
-        # SOFT CONSTRAINTS
-        # 1) Classics should be on prime time
-        classics = [['Sporting', 'Benfica'], ['Benfica', 'Sporting'], ['Sporting', 'Porto'], ['Porto', 'Sporting'], ['Porto', 'Benfica'], ['Benfica', 'Porto'],]
+        if self._state is not None and len(changes) <= MAX_DELTA_POSITIONS:
+            self._fitness = self._state.apply(changes)
+            return
+        for position, game in changes.items():
+            self.genome[position] = game
+        self._fitness = None
+        self._state = None
+
+    def move_delta(self, changes):
+        """Fitness change a local move would cause, without applying it."""
+        if self._state is None:
+            self._state = FitnessState(self.genome, self.problem)
+            self._fitness = self._state.fitness
+        return self._state.delta(changes)
+
+    def violated_positions(self):
+        """Positions of the games of the teams breaking a team constraint, see delta.FitnessState."""
+        if self._state is None:
+            self._state = FitnessState(self.genome, self.problem)
+            self._fitness = self._state.fitness
+        return self._state.violated_positions()
 
-        game_date_mapping = self.create_game_date_mapping(random_game_dates_pt)
-
-        for match in self.representation:
-            match_str = str(match)
-            if match in classics:
-                match_date = game_date_mapping[match_str]
-                if match_date.weekday() == 5:
-                    fitness += 1  # Larger reward for meeting the soft constraint
-                else:
-                    fitness -= -1
-
-        # 2) Check if the ratio of Saturday games is balanced with Sunday's
-        saturdays_played = {team: 0 for team in self.teams}
-        sundays_played = {team: 0 for team in self.teams}
-
-        for match in self.representation:
-            match_str = str(match)
-            if match in classics:
-                match_date = game_date_mapping[match_str]
-                if match_date.weekday() == 5:
-                    saturdays_played[match[0]] += 1
-                    saturdays_played[match[1]] += 1
-                else:
-                    sundays_played[match[0]] += 1
-                    sundays_played[match[1]] += 1
-
-        # Calculate the fitness contribution for this soft constraint
-        saturday_sunday_difference = sum(abs(saturdays_played[team] - sundays_played[team]) for team in self.teams)
-        saturday_sunday_fitness_contribution = min(5, 5 - saturday_sunday_difference)
-        fitness += saturday_sunday_fitness_contribution
-
-        # 3) Ensure no two classic matches occur with less than a weekend in between but benefit if a week of interval
-        for i, match in enumerate(self.representation):
-            if match in classics:
-                match_date = self.game_date_mapping[str(match)]
-                for other_match in self.representation[i + 1:]:
-                    if other_match in classics:
-                        other_match_date = self.game_date_mapping[str(other_match)]
-                        days_interval = (other_match_date - match_date).days
-                        if days_interval > 8:  # A weekend of pause between classics
-                            fitness += 2
-                        elif days_interval >= 7:  # classics with an interval of one week
-                            fitness += 1
-                        # Break loop if a classic match with enough interval is found
-                        break
-
-        return fitness
-
-
-    def __len__(self):
-        return len(self.representation)
+    def __repr__(self):
+        return f"Representation: {self.representation}, Fitness: {self.fitness}"
 
-    def __getitem__(self, position):
-        return self.representation[position]
+    def get_fitness(self):
+        """Fitness of the schedule under the constraints of its problem, higher is better.
 
-    def __setitem__(self, position, value):
-        self.representation[position] = value
+        The hard and soft constraints and their weights are configurable, see
+        constraints.DEFAULT_CONSTRAINTS for those of the original scoring.
 
-    def __repr__(self):
-        return f"Representation: {self.representation}, Fitness: {self.fitness}"
+        Returns:
+            int: The fitness.
+        """
+        return score(self.problem, self.genome)
 
 class Population:
-    def __init__(self, size, teams, elitism=False, **kwargs):
+    def __init__(self, size, teams, elitism=False, cache=None, individuals=None, init="shuffle", problem=None, **kwargs):
+        """
+        Args:
+            size (int): Number of individuals.
+            teams (list): Team names of the league.
+            elitism (bool): Whether to keep the best individual of every generation, or the number of best
+                individuals to keep (k-elitism).
+            cache (FitnessCache): Fitness cache shared across generations and runs.
+            individuals (list): Individuals to start from instead of random ones.
+            init (str): How random individuals are seeded, "shuffle" or "round_robin", see seeding.seed_genomes.
+            problem (ProblemInstance): Compiled problem, ProblemInstance.get(teams) by default.
+        """
         self.size = size
         self.teams = teams
+        self.problem = ProblemInstance.get(teams) if problem is None else problem
         self.elitism = elitism
-        self.individuals = [Individual(teams=teams, representation=None, repetition=kwargs.get("repetition", False)) for _ in range(size)]
+        # Optional FitnessCache shared across generations and runs
+        self.cache = cache
+        # Full fitness evaluations so far, cache hits and incremental updates excluded
+        self.evaluations = 0
+        # Why the last evolve run ended
+        self.stop_reason = None
+        # (generation, best fitness, fitness list) of a run restored by load
+        self._resumed = None
+        # Arguments of evolve to continue a run restored by load
+        self.run_config = None
+        # Fittest individuals of the current generation in evolve, see elites.TopK
+        self.top = None
+        # BatchFitness of the problem, built on the first evaluation large enough to use it
+        self._batch_fitness = None
+        if individuals is None and kwargs.get("repetition", False):
+            self.individuals = [Individual(problem=self.problem, representation=None, repetition=True) for _ in range(size)]
+        elif individuals is None:
+            self.individuals = [Individual(problem=self.problem, representation=genome) for genome in seed_genomes(teams, size, init)]
+        else:
+            # Start from existing individuals, e.g. a population restored in another process
+            self.individuals = list(individuals)
+
+    def evolve(self, gens, xo_prob, mut_prob, select, mutate, crossover, executor=None, workers=None, stats=None,
+               observers=None, stop=None, checkpoint=None, checkpoint_every=10, local_search=None, pool=False,
+               batched=False):
+        """Evolve the population.
+
+        Offspring are always bred in this process. With an executor (see parallel.evaluation_pool)
+        or a number of workers they are scored in a process pool, giving the same results as the
+        serial path for a given seed.
+
+        Args:
+            gens (int): Number of generations.
+            xo_prob (float): Crossover probability.
+            mut_prob (float): Mutation probability of every offspring.
+            select (function): Selection function, see selection.py.
+            mutate (function): Mutation function, see mutation.py.
+            crossover (function): Crossover function, see xo.py.
+            executor (ProcessPoolExecutor): Evaluation pool to score offspring in.
+            workers (int): Size of an evaluation pool to create for this run, if no executor is given.
+            stats (EvolveStats): Collects the time of every phase and the counters of the run, see profiling.py.
+                True for a default EvolveStats.
+            observers (list): Observers of the run, see observers.py. By default a ConsoleObserver prints
+                the best fitness at most once a second; pass [] for a silent run.
+            stop (list): Stopping criteria that can end the run early, see stopping.py. The reason the run
+                stopped is stored in stop_reason.
+            checkpoint (str): File the run is saved to every checkpoint_every generations and when it ends,
+                see Population.resume.
+            checkpoint_every (int): Generations between checkpoints.
+            local_search (LocalSearch): Local search improving the best offspring of every generation once
+                they are scored, see local_search.py.
+            pool (bool): Breed every generation into a preallocated GenomePool instead of new individuals,
+                see pool.py. The individuals of the population are then recycled from one generation to the
+                next one; copy those to keep.
+            batched (bool): Breed every generation at once with the batched version of the crossover and the
+                mutation, see vectorized.py. The operators are the same, the random draws are not, so the
+                results differ from those of the default path.
+
+        Returns:
+            tuple: Best fitness found and the best fitness of every generation, followed by the stats if requested.
+        """
+        if executor is None and workers:
+            from parallel import evaluation_pool
+            with evaluation_pool(self.problem, workers) as executor:
+                return self.evolve(gens, xo_prob, mut_prob, select, mutate, crossover, executor=executor, stats=stats,
+                                   observers=observers, stop=stop, checkpoint=checkpoint,
+                                   checkpoint_every=checkpoint_every, local_search=local_search, pool=pool,
+                                   batched=batched)
+
+        if stats is True:
+            stats = EvolveStats()
+        timer = NO_STATS if stats is None else stats
+        if observers is None:
+            observers = [ConsoleObserver()]
+        stop = stop or []
+        for criterion in stop:
+            criterion.start(self)
+        self.stop_reason = f"{gens} generations run"
+        evaluations = self.evaluations
 
-    def evolve(self, gens, xo_prob, mut_prob, select, mutate, crossover):
         best_fitness = None  # Initialize best_fitness variable
         fitness_list=[]
-
-        for gen in range(gens):
-            new_pop = []
-
-            if self.elitism:
-                # Apply elitism: Preserve the best individual from the current population
-                best_individual = max(self.individuals, key=lambda x: x.fitness)
-                new_pop.append(best_individual)
-
-            # Apply crossover and mutation
-            while len(new_pop) < self.size:
-                parent1, parent2 = select(self), select(self)
-
-                if uniform(0, 1) < xo_prob:
-                    offspring1, offspring2 = crossover(parent1, parent2)
+        start = 0
+        if self._resumed is not None:
+            # Continue a run restored by load
+            start, best_fitness, fitness_list = self._resumed
+            self._resumed = None
+        self.evaluate(self.individuals, executor)
+        if pool:
+            from pool import GenomePool
+            pool = GenomePool(self.problem, self.size)
+            self.individuals = pool.load(self.individuals)
+        out = None
+        elites = min(int(self.elitism), self.size)
+        self.top = TopK(elites, self.individuals)
+
+        try:
+            for gen in range(start, gens):
+                timer.start_generation(gen)
+                new_pop = []
+
+                # Apply elitism: Preserve the best individuals from the current population, with their fitness
+                for elite in self.top.elites(elites) if elites else ():
+                    if pool:
+                        # Elites are copied, never shared between the two buffers of the pool
+                        pool.next[len(new_pop)].assign(elite)
+                        elite = pool.next[len(new_pop)]
+                    new_pop.append(elite)
+
+                # Draw the parents of every offspring pair at once from this generation's selection table
+                parents = selection_table(select, self)(2 * ((self.size - len(new_pop) + 1) // 2))
+                timer.lap("selection")
+
+                if batched:
+                    self._breed_batched(new_pop, parents, xo_prob, mut_prob, mutate, crossover, pool, timer)
+
+                # Apply crossover and mutation
+                while len(new_pop) < self.size:
+                    parent1, parent2 = parents.pop(), parents.pop()
+                    if pool:
+                        out = pool.next[len(new_pop)], pool.next[len(new_pop) + 1]
+
+                    if uniform(0, 1) < xo_prob:
+                        if out is None:
+                            offspring1, offspring2 = crossover(parent1, parent2)
+                        else:
+                            offspring1, offspring2 = crossover(parent1, parent2, out=out)
+                        timer.lap("crossover")
+                    elif out is None:
+                        # Copies keep the parents' fitness and protect them (and the elite) from mutation
+                        offspring1, offspring2 = parent1.copy(), parent2.copy()
+                        timer.lap("copy")
+                    else:
+                        out[0].assign(parent1)
+                        out[1].assign(parent2)
+                        offspring1, offspring2 = out
+                        timer.lap("copy")
+
+                    if uniform(0, 1) < mut_prob:
+                        offspring1 = mutate(offspring1)
+                    if uniform(0, 1) < mut_prob:
+                        offspring2 = mutate(offspring2)
+                    timer.lap("mutation")
+
+                    new_pop.append(offspring1)
+                    if len(new_pop) < self.size:  # Ensure we don't exceed population size
+                        new_pop.append(offspring2)
+
+                # The top of the generation is filled as the offspring are scored
+                top = TopK(elites)
+                self.evaluate(new_pop, executor, top)
+                self.individuals = new_pop
+                if pool:
+                    pool.swap()
+                if local_search is not None:
+                    timer.lap("evaluation")
+                    local_search(new_pop[elites:])
+                    # The fitness of the improved offspring changed since they were offered
+                    top = TopK(elites, new_pop)
+                    timer.lap("local_search")
+                self.top = top
+
+                # Update best_fitness if a new best solution is found
+                best = self.top.best
+                max_fitness = best.fitness
+                timer.lap("evaluation")
+                fitness_list.append(max_fitness) # keep the fitness if the generation
+                improved = best_fitness is None or max_fitness > best_fitness
+                if improved:
+                    best_fitness = max_fitness
+
+                for observer in observers:
+                    observer.on_generation(self, gen + 1, best)
+                    if improved:
+                        observer.on_improvement(self, gen + 1, best)
+                timer.end_generation(gen)
+
+                reasons = [criterion.check(self, gen + 1, best_fitness, fitness_list) for criterion in stop]
+                if any(reasons):
+                    self.stop_reason = f"{next(filter(None, reasons))} after {gen + 1} generations"
+                if checkpoint and (any(reasons) or (gen + 1) % checkpoint_every == 0 or gen + 1 == gens):
+                    write_checkpoint(checkpoint, {
+                        "generation": gen + 1, "gens": gens, "xo_prob": xo_prob, "mut_prob": mut_prob,
+                        "select": operator_name(select), "mutate": operator_name(mutate),
+                        "crossover": operator_name(crossover), "checkpoint_every": checkpoint_every,
+                        "size": self.size, "elitism": self.elitism, "problem": self.problem,
+                        "genomes": [individual.genome for individual in self.individuals],
+                        "fitness": [individual.fitness for individual in self.individuals],
+                        "best_fitness": best_fitness, "fitness_list": fitness_list,
+                        "evaluations": self.evaluations, "rng": getstate(),
+                        "batched": batched, "pool": bool(pool), "local_search": local_search,
+                    })
+                if any(reasons):
+                    break
+        finally:
+            # Stops profiling even if the run ends before the last generation to profile
+            timer.finish()
+
+        for observer in observers:
+            observer.on_finish(self, best_fitness, fitness_list)
+        if stats is None:
+            return best_fitness, fitness_list
+        stats.evaluations += self.evaluations - evaluations
+        return best_fitness, fitness_list, stats
+
+
+
+    def _breed_batched(self, new_pop, parents, xo_prob, mut_prob, mutate, crossover, pool, timer):
+        """Breed the offspring of a generation with batched operators, see evolve(..., batched=True).
+
+        The parents are paired as in the default path. Offspring that are neither crossed nor mutated are
+        copies of their parents, keeping their fitness.
+        """
+        from vectorized import batch_operators, generator, genome_row
+        from fitness import genome_matrix
+        try:
+            batch_crossover, batch_mutate = batch_operators[crossover], batch_operators[mutate]
+        except KeyError as error:
+            raise ValueError(f"No batched version of {error.args[0].__name__}, see vectorized.batch_operators") from None
+
+        rng = generator()
+        parents = parents[::-1]
+        pairs = len(parents) // 2
+        crossed = rng.random(pairs) < xo_prob
+        offspring = batch_crossover(genome_matrix(parents[0::2]), genome_matrix(parents[1::2]), crossed, rng)
+        timer.lap("crossover")
+        mutated = [rng.random(pairs) < mut_prob, rng.random(pairs) < mut_prob]
+        offspring = [batch_mutate(genomes, mask, rng) for genomes, mask in zip(offspring, mutated)]
+        timer.lap("mutation")
+
+        for pair in range(pairs):
+            for i in range(2):
+                if len(new_pop) == self.size:
+                    break
+                parent = parents[2 * pair + i]
+                changed = crossed[pair] or mutated[i][pair]
+                if pool:
+                    individual = pool.next[len(new_pop)]
+                    if changed:
+                        individual.overwrite(genome_row(offspring[i][pair]))
+                    else:
+                        individual.assign(parent)
+                elif changed:
+                    individual = Individual(problem=self.problem, representation=genome_row(offspring[i][pair]))
                 else:
-                    offspring1, offspring2 = parent1, parent2
+                    individual = parent.copy()
+                new_pop.append(individual)
+        timer.lap("copy")
 
-                if uniform(0, 1) < mut_prob:
-                    offspring1 = mutate(offspring1)
-                if uniform(0, 1) < mut_prob:
-                    offspring2 = mutate(offspring2)
-
-                new_pop.append(Individual(teams=self.teams, representation=offspring1.representation))
-                if len(new_pop) < self.size:  # Ensure we don't exceed population size
-                    new_pop.append(Individual(teams=self.teams, representation=offspring2.representation))
+    @classmethod
+    def load(cls, path, cache=None):
+        """Restore a population from a checkpoint written by evolve.
 
-            self.individuals = new_pop
+        The random generator is restored too, so the run continues exactly as
+        it would have without interruption as long as evolve(**population.run_config)
+        is called right away.
 
+        Args:
+            path (str): The checkpoint file.
+            cache (FitnessCache): Fitness cache of the restored population.
 
-            # Update best_fitness if a new best solution is found
-            max_fitness = max(self.individuals, key=lambda x: x.fitness).fitness
-            fitness_list.append(max_fitness) # keep the fitness if the generation
-            if best_fitness is None or max_fitness > best_fitness:
-                best_fitness = max_fitness
+        Returns:
+            Population: The population, with the arguments of evolve in run_config.
+        """
+        state = read_checkpoint(path)
+        problem = state["problem"]
+        individuals = []
+        for genome, fitness in zip(state["genomes"], state["fitness"]):
+            individual = Individual(problem=problem, representation=genome)
+            individual.fitness = fitness
+            individuals.append(individual)
+
+        population = cls(size=state["size"], teams=list(problem.teams), elitism=state["elitism"], cache=cache,
+                         individuals=individuals, problem=problem)
+        population.evaluations = state["evaluations"]
+        population._resumed = (state["generation"], state["best_fitness"], state["fitness_list"])
+        population.run_config = {
+            "gens": state["gens"], "xo_prob": state["xo_prob"], "mut_prob": state["mut_prob"],
+            "select": resolve_operator(state["select"]), "mutate": resolve_operator(state["mutate"]),
+            "crossover": resolve_operator(state["crossover"]),
+            "checkpoint": path, "checkpoint_every": state["checkpoint_every"],
+            # Missing from checkpoints written before these options existed
+            "batched": state.get("batched", False), "pool": state.get("pool", False),
+            "local_search": state.get("local_search"),
+        }
+        setstate(state["rng"])
+        return population
+
+    @classmethod
+    def resume(cls, path, cache=None, **kwargs):
+        """Continue a run from its checkpoint, see Population.load.
+
+        Args:
+            path (str): The checkpoint file.
+            cache (FitnessCache): Fitness cache of the restored population.
+            kwargs: Arguments of evolve overriding those of the checkpoint, e.g. gens to run longer,
+                or the observers and stopping criteria, which are not saved.
+
+        Returns:
+            tuple: What evolve returns, covering the whole run since its first generation.
+        """
+        population = cls.load(path, cache)
+        return population.evolve(**dict(population.run_config, **kwargs))
 
-            # Evaluate fitness, etc.
-            print(f"Best individual of gen #{gen + 1}: {max(self.individuals, key=attrgetter('fitness'))}")
+    def evaluate(self, individuals, executor=None, top=None):
+        """Score the individuals that have no fitness yet, going through the fitness cache if there is one.
 
-        return best_fitness, fitness_list
+        Individuals missing from the cache are scored together with fitness.BatchFitness, or one by one with
+        get_fitness when there are fewer than fitness.MIN_BATCH of them, which is faster for so few.
 
+        Args:
+            individuals (list): Individuals to score.
+            executor (ProcessPoolExecutor): Evaluation pool to score the individuals in.
+            top (TopK): Offered every individual, in order, once its fitness is known, see elites.py.
+        """
+        pending = []
+        for individual in individuals:
+            if individual._fitness is None:
+                fitness = None if self.cache is None else self.cache.get(individual.genome)
+                if fitness is None:
+                    pending.append(individual)
+                else:
+                    individual._fitness = fitness
 
+        if executor is not None:
+            from parallel import score_parallel
+            scores = score_parallel(executor, [individual.genome for individual in pending])
+        else:
+            from fitness import BatchFitness, genome_matrix, MIN_BATCH
+            if len(pending) < MIN_BATCH:
+                scores = [individual.get_fitness() for individual in pending]
+            else:
+                if self._batch_fitness is None:
+                    self._batch_fitness = BatchFitness(self.problem)
+                scores = self._batch_fitness(genome_matrix(pending)).tolist()
+        self.evaluations += len(pending)
+
+        for individual, fitness in zip(pending, scores):
+            individual._fitness = fitness
+            if self.cache is not None:
+                self.cache.put(individual.genome, fitness)
+        if top is not None:
+            for individual in individuals:
+                top.offer(individual)
+
+    def steady_state(self, steps, xo_prob, mut_prob, select, mutate, crossover, batch=2, replace="worst",
+                     executor=None, observers=None, stop=None):
+        """Evolve the population in steady-state mode.
+
+        Every step breeds a batch of offspring from the current population and
+        puts them in place of its worst (or oldest) members, found with a heap in
+        O(log N). Only the offspring are allocated, and the population always
+        holds the best individuals found so far, so best_individual can be
+        queried at any moment. With elitism and oldest replacement the best
+        individual is never replaced.
+
+        Args:
+            steps (int): Number of steps.
+            xo_prob (float): Crossover probability.
+            mut_prob (float): Mutation probability of every offspring.
+            select (function): Selection function, see selection.py.
+            mutate (function): Mutation function, see mutation.py.
+            crossover (function): Crossover function, see xo.py.
+            batch (int): Offspring bred every step.
+            replace (str): "worst" or "oldest", the members the offspring replace.
+            executor (ProcessPoolExecutor): Evaluation pool to score offspring in.
+            observers (list): Observers of the run, notified after every step, see observers.py.
+            stop (list): Stopping criteria checked after every step, see stopping.py.
+
+        Returns:
+            tuple: Best fitness found and the best fitness after every step.
+        """
+        if replace not in ("worst", "oldest"):
+            raise ValueError(f"Unknown replacement: {replace}")
+        if observers is None:
+            observers = [ConsoleObserver()]
+        stop = stop or []
+        for criterion in stop:
+            criterion.start(self)
+        self.stop_reason = f"{steps} steps run"
+
+        # The top of evolve is not kept up to date by steady-state replacement
+        self.top = None
+        self.evaluate(self.individuals, executor)
+        best = max(self.individuals, key=attrgetter('fitness'))
+        best_fitness = best.fitness
+        fitness_list = []
+
+        # (fitness, birth, index) or (birth, index) of every member, the next one to replace first
+        def entry(individual, birth, index):
+            return (individual.fitness, birth, index) if replace == "worst" else (birth, index)
+        heap = [entry(individual, birth, birth) for birth, individual in enumerate(self.individuals)]
+        heapify(heap)
+        born = len(heap)
+
+        for step in range(steps):
+            parents = selection_table(select, self)(2 * ((batch + 1) // 2))
+            offspring = []
+            while len(offspring) < batch:
+                parent1, parent2 = parents.pop(), parents.pop()
+                if uniform(0, 1) < xo_prob:
+                    offspring.extend(crossover(parent1, parent2))
+                else:
+                    # Copies keep the parents' fitness and protect them from mutation
+                    offspring.extend((parent1.copy(), parent2.copy()))
+            del offspring[batch:]
+            for i, individual in enumerate(offspring):
+                if uniform(0, 1) < mut_prob:
+                    offspring[i] = mutate(individual)
+            self.evaluate(offspring, executor)
+
+            for individual in offspring:
+                index = heappop(heap)[-1]
+                if self.elitism and self.individuals[index] is best and heap:
+                    # The best individual is kept, as if it was born again
+                    heappush(heap, entry(best, born, index))
+                    born += 1
+                    index = heappop(heap)[-1]
+                replaced, self.individuals[index] = self.individuals[index], individual
+                heappush(heap, entry(individual, born, index))
+                born += 1
+                if replaced is best:
+                    best = max(self.individuals, key=attrgetter('fitness'))
+                elif individual.fitness > best.fitness:
+                    best = individual
+
+            improved = best.fitness > best_fitness
+            best_fitness = max(best_fitness, best.fitness)
+            fitness_list.append(best.fitness)
+            for observer in observers:
+                observer.on_generation(self, step + 1, best)
+                if improved:
+                    observer.on_improvement(self, step + 1, best)
+
+            reasons = [criterion.check(self, step + 1, best_fitness, fitness_list) for criterion in stop]
+            if any(reasons):
+                self.stop_reason = f"{next(filter(None, reasons))} after {step + 1} steps"
+                break
+
+        for observer in observers:
+            observer.on_finish(self, best_fitness, fitness_list)
+        return best_fitness, fitness_list
 
     def best_individual(self):
+        """The fittest individual, the first one among equals.
+
+        Read in O(1) from the top kept by evolve while it covers the current generation, see elites.TopK.
+        """
+        if self.top is not None and self.top.count == len(self.individuals):
+            return self.top.best
         return max(self.individuals, key=lambda x: x.fitness)
 
     def __len__(self):
@@ -0,0 +1,65 @@
+import importlib
+import os
+import pickle
+from array import array
+from genome import GENOME_TYPECODE
+
+MAGIC = b"WLEVOCKP"
+VERSION = 1
+
+
+def operator_name(func):
+    """Importable name of a selection, crossover or mutation function, e.g. "xo:pmx"."""
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def resolve_operator(name):
+    """The function of an operator_name."""
+    module, qualname = name.split(":")
+    func = importlib.import_module(module)
+    for attribute in qualname.split("."):
+        func = getattr(func, attribute)
+    return func
+
+
+def write_checkpoint(path, state):
+    """Write the state of an evolve run to a checkpoint file.
+
+    The file starts with MAGIC and the format version, followed by the
+    pickled state. The genomes are stored as one block of raw genes. The file
+    is replaced atomically, so an interrupted write leaves the previous
+    checkpoint intact.
+
+    Args:
+        path (str): The checkpoint file.
+        state (dict): The run, as built by Population.evolve; "genomes" is a list of genomes.
+    """
+    genomes = state["genomes"]
+    state = dict(state, genome_length=len(genomes[0]) if genomes else 0,
+                 genomes=b"".join(genome.tobytes() for genome in genomes))
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(VERSION.to_bytes(2, "little"))
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def read_checkpoint(path):
+    """Read a checkpoint file written by write_checkpoint.
+
+    Returns:
+        dict: The state of the run, with "genomes" as a list of genomes.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        version = int.from_bytes(f.read(2), "little")
+        if version != VERSION:
+            raise ValueError(f"{path} has checkpoint version {version}, expected {VERSION}")
+        state = pickle.load(f)
+
+    blob = array(GENOME_TYPECODE, state["genomes"])
+    length = state.pop("genome_length")
+    state["genomes"] = [blob[i:i + length] for i in range(0, len(blob), length)] if length else []
+    return state
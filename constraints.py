@@ -0,0 +1,399 @@
+from copy import copy
+
+# Kickoff times are in microseconds since the first slot, see ProblemInstance.slot_time
+DAY = 86_400_000_000
+
+
+class Constraint:
+    """A term of the fitness function.
+
+    Constraints are configured with their weights, then compiled against a
+    ProblemInstance into integer lookup tables (see ProblemInstance.constraints).
+    Every constraint is linear in the length of the schedule. There are three
+    kinds, which decide how the schedule is handed to them and what
+    FitnessState rescores after a move:
+
+        "pairs": scored from the number of pairs of teams not meeting exactly twice.
+        "team": scored team by team from the games of the team in schedule order;
+            a move rescores the teams of the matches it touches.
+        "schedule": scored from the whole schedule; a move rescores the constraint
+            if it touches a match for which involves(game) is true.
+
+    Repeated matches are all dated by their last occurrence in the schedule.
+    Weights are the points added per occurrence, negative for penalties.
+    """
+
+    kind = "schedule"
+
+    def compile(self, problem):
+        """A copy of the constraint bound to a problem, with its lookup tables."""
+        compiled = copy(self)
+        compiled.problem = problem
+        compiled._compile(problem)
+        return compiled
+
+    def _compile(self, problem):
+        pass
+
+    def involves(self, game):
+        """Whether moving a match can change the score of this "schedule" constraint."""
+        return True
+
+    def team(self, team, games, kickoff):
+        """Score of a "team" constraint for one team.
+
+        Args:
+            team (int): Team index.
+            games (list): Match IDs of the games of the team, in schedule order.
+            kickoff (list): Kickoff of every match ID in the schedule, see ProblemInstance.slot_time.
+        """
+        raise NotImplementedError
+
+    def teams(self, matches, kickoff):
+        """Score of a "team" constraint summed over all teams, see team.
+
+        Args:
+            matches (list): Match IDs of the games of every team, in schedule order.
+            kickoff (list): Kickoff of every match ID in the schedule.
+        """
+        return sum(self.team(team, games, kickoff) for team, games in enumerate(matches))
+
+    def schedule(self, genome, slot, classics):
+        """Score of a "schedule" constraint.
+
+        Args:
+            genome (array): The schedule.
+            slot (list): Date slot of every match ID in the schedule.
+            classics (list): Match IDs of the classics, in schedule order.
+        """
+        raise NotImplementedError
+
+    def _config(self):
+        return type(self), tuple((name, value) for name, value in vars(self).items()
+                                 if name != "problem" and not name.startswith("_"))
+
+    def __eq__(self, other):
+        return isinstance(other, Constraint) and self._config() == other._config()
+
+    def __hash__(self):
+        return hash(self._config())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={value!r}' for name, value in self._config()[1])})"
+
+
+class PairCount(Constraint):
+    """All teams must play against each other twice (once at home and once away).
+
+    Penalizes every pair of teams that meets, but not exactly twice.
+    """
+
+    kind = "pairs"
+
+    def __init__(self, weight=-10):
+        self.weight = weight
+
+
+def _away_streak_violations(team, games, away, max_streak):
+    """Away games of a team beyond max_streak in a row, see AwayStreak."""
+    violations = 0
+    away_streak = 0
+    for game in games:
+        if away[game] == team:  # Away game
+            away_streak += 1
+            if away_streak > max_streak:
+                violations += 1
+        else:
+            away_streak = 0
+    return violations
+
+
+class AwayStreak(Constraint):
+    """No team should play more than max_streak consecutive away games.
+
+    Penalizes every away game beyond the streak.
+    """
+
+    kind = "team"
+
+    def __init__(self, max_streak=2, weight=-10):
+        self.max_streak = max_streak
+        self.weight = weight
+
+    def _compile(self, problem):
+        self._away = problem.away
+
+    def team(self, team, games, kickoff):
+        return self.weight * _away_streak_violations(team, games, self._away, self.max_streak)
+
+    def teams(self, matches, kickoff):
+        away, max_streak = self._away, self.max_streak
+        return self.weight * sum(_away_streak_violations(team, games, away, max_streak)
+                                 for team, games in enumerate(matches))
+
+
+def _clash_violations(games, kickoff, low, high):
+    """Games played between low and high microseconds after the previous game of the team, see WeekendClash."""
+    violations = 0
+    previous = None
+    for game in games:
+        time = kickoff[game]
+        if previous is not None and low <= time - previous < high:
+            violations += 1
+        previous = time
+    return violations
+
+
+class WeekendClash(Constraint):
+    """No team should play more than one game in one weekend.
+
+    Penalizes every game of a team played less than min_days (whole days)
+    after its previous game in the schedule.
+    """
+
+    kind = "team"
+
+    def __init__(self, min_days=2, weight=-10):
+        self.min_days = min_days
+        self.weight = weight
+
+    def _bounds(self):
+        # abs(days // DAY) < min_days, without the division
+        return (1 - self.min_days) * DAY, self.min_days * DAY
+
+    def team(self, team, games, kickoff):
+        return self.weight * _clash_violations(games, kickoff, *self._bounds())
+
+    def teams(self, matches, kickoff):
+        low, high = self._bounds()
+        return self.weight * sum(_clash_violations(games, kickoff, low, high) for games in matches)
+
+
+class _ClassicConstraint(Constraint):
+    """A constraint on the classics of the problem (see ProblemInstance.classic)."""
+
+    def _compile(self, problem):
+        self._classic = problem.classic
+
+    def involves(self, game):
+        return self._classic[game]
+
+
+class ClassicPrimeTime(_ClassicConstraint):
+    """Classic matches should be scheduled on prime time (Saturdays).
+
+    Adds saturday points for every classic on the prime day and other points
+    for every classic on another day. Both default to 1, as the original
+    scoring rewarded every classic alike.
+    """
+
+    def __init__(self, saturday=1, other=1, prime_day=5):
+        self.saturday = saturday
+        self.other = other
+        self.prime_day = prime_day
+
+    def _compile(self, problem):
+        super()._compile(problem)
+        self._weekday = problem.slot_weekday
+
+    def schedule(self, genome, slot, classics):
+        weekday, prime_day = self._weekday, self.prime_day
+        on_prime_day = 0
+        for game in classics:
+            if weekday[slot[game]] == prime_day:
+                on_prime_day += 1
+        return self.saturday * on_prime_day + self.other * (len(classics) - on_prime_day)
+
+
+class ClassicBalance(_ClassicConstraint):
+    """Balance the number of classics played on Saturdays and Sundays for each team.
+
+    Every classic counts +1 for both teams on the prime day and -1 otherwise;
+    the score is weight * min(cap, cap - the sum of the absolute balances).
+    """
+
+    def __init__(self, cap=5, weight=1, prime_day=5):
+        self.cap = cap
+        self.weight = weight
+        self.prime_day = prime_day
+
+    def _compile(self, problem):
+        super()._compile(problem)
+        self._weekday = problem.slot_weekday
+        self._home, self._away = problem.home, problem.away
+        self._n_teams = problem.n_teams
+
+    def schedule(self, genome, slot, classics):
+        weekday, prime_day, home, away = self._weekday, self.prime_day, self._home, self._away
+        balance = [0] * self._n_teams
+        for game in classics:
+            played = 1 if weekday[slot[game]] == prime_day else -1
+            balance[home[game]] += played
+            balance[away[game]] += played
+        difference = 0
+        for team_balance in balance:
+            difference += abs(team_balance)
+        return self.weight * min(self.cap, self.cap - difference)
+
+
+class ClassicSpacing(_ClassicConstraint):
+    """No two classic matches should occur within a weekend interval, but benefit if there is a week interval.
+
+    Compares every classic with the next one in the schedule: more than
+    rest_days whole days apart earns rest_bonus, week_days to rest_days
+    earns week_bonus.
+    """
+
+    def __init__(self, rest_days=8, week_days=7, rest_bonus=2, week_bonus=1):
+        self.rest_days = rest_days
+        self.week_days = week_days
+        self.rest_bonus = rest_bonus
+        self.week_bonus = week_bonus
+
+    def _compile(self, problem):
+        super()._compile(problem)
+        self._time = problem.slot_time
+
+    def schedule(self, genome, slot, classics):
+        score = 0
+        for game, next_game in zip(classics, classics[1:]):
+            days_interval = (self._time[slot[next_game]] - self._time[slot[game]]) // DAY
+            if days_interval > self.rest_days:  # A weekend of pause between classics
+                score += self.rest_bonus
+            elif days_interval >= self.week_days:  # classics with an interval of one week
+                score += self.week_bonus
+        return score
+
+
+class Derby(Constraint):
+    """No more than max_per_weekend derbies should be played in one weekend.
+
+    Derbies are games between teams of the same city, which need the
+    police and the broadcasters at full strength. Penalizes every derby
+    beyond the limit in a weekend.
+    """
+
+    def __init__(self, derbies, max_per_weekend=1, weight=-10):
+        """
+        Args:
+            derbies (list): (team, team) pairs of names; both home and away games are derbies.
+            max_per_weekend (int): Derbies allowed in one weekend.
+            weight (int): Points per derby over the limit.
+        """
+        self.derbies = tuple(tuple(sorted(derby)) for derby in derbies)
+        self.max_per_weekend = max_per_weekend
+        self.weight = weight
+
+    def _compile(self, problem):
+        derbies = set(self.derbies)
+        self._derby = bytes(tuple(sorted(fixture)) in derbies for fixture in problem.fixtures)
+        self._weekend = problem.slot_weekend
+
+    def involves(self, game):
+        return self._derby[game]
+
+    def schedule(self, genome, slot, classics):
+        weekends = {}
+        for game in genome:
+            if self._derby[game]:
+                weekend = self._weekend[slot[game]]
+                weekends[weekend] = weekends.get(weekend, 0) + 1
+        return self.weight * sum(count - self.max_per_weekend for count in weekends.values()
+                                 if count > self.max_per_weekend)
+
+
+class StadiumSharing(Constraint):
+    """Teams sharing a stadium cannot play at home on the same day.
+
+    Penalizes every extra home game in a shared stadium on one day.
+    """
+
+    def __init__(self, stadiums, weight=-10):
+        """
+        Args:
+            stadiums (list): Groups of team names sharing a stadium.
+            weight (int): Points per extra home game.
+        """
+        self.stadiums = tuple(tuple(sorted(stadium)) for stadium in stadiums)
+        self.weight = weight
+
+    def _compile(self, problem):
+        stadium_of = {team: i for i, stadium in enumerate(self.stadiums) for team in stadium}
+        # Stadium of every team index, -1 for teams with a stadium of their own
+        self._stadium = tuple(stadium_of.get(team, -1) for team in problem.teams)
+        self._home = problem.home
+        self._day = problem.slot_day
+
+    def involves(self, game):
+        return self._stadium[self._home[game]] >= 0
+
+    def schedule(self, genome, slot, classics):
+        days = {}
+        for game in genome:
+            stadium = self._stadium[self._home[game]]
+            if stadium >= 0:
+                key = (stadium, self._day[slot[game]])
+                days[key] = days.get(key, 0) + 1
+        return self.weight * sum(count - 1 for count in days.values() if count > 1)
+
+
+# The scoring of the original fitness function
+DEFAULT_CONSTRAINTS = (PairCount(), AwayStreak(), WeekendClash(), ClassicPrimeTime(), ClassicBalance(),
+                       ClassicSpacing())
+
+
+def pair_weight(constraints):
+    """Points per pair of teams not meeting exactly twice, 0 without a PairCount."""
+    return sum(constraint.weight for constraint in constraints if constraint.kind == "pairs")
+
+
+def score(problem, genome, constraints=None):
+    """Fitness of a schedule under the constraints of a problem.
+
+    Args:
+        problem (ProblemInstance): The compiled problem.
+        genome (array): The schedule, as match IDs.
+        constraints (list): Compiled constraints to score, all those of the problem by default.
+
+    Returns:
+        int: The fitness.
+    """
+    if constraints is None:
+        weight, team_constraints = problem.pair_weight, problem.team_constraints
+        schedule_constraints = problem.schedule_constraints
+    else:
+        weight = pair_weight(constraints)
+        team_constraints = [constraint for constraint in constraints if constraint.kind == "team"]
+        schedule_constraints = [constraint for constraint in constraints if constraint.kind == "schedule"]
+    home, away, pair = problem.home, problem.away, problem.pair
+    fitness = 0
+
+    # Date slot of every match, repeated matches are dated by their last occurrence
+    slot = [0] * problem.n_matches
+    for position, game in enumerate(genome):
+        slot[game] = position
+
+    # Collect matches for each team
+    matches = [[] for _ in problem.teams]
+    pairs_count = [0] * (problem.n_teams * problem.n_teams)
+    for game in genome:
+        matches[home[game]].append(game)
+        matches[away[game]].append(game)
+        pairs_count[pair[game]] += 1
+
+    if weight:
+        # Pairs that meet, but not exactly twice
+        fitness += weight * (len(pairs_count) - pairs_count.count(0) - pairs_count.count(2))
+
+    if team_constraints:
+        slot_time = problem.slot_time
+        kickoff = [slot_time[position] for position in slot]
+        for constraint in team_constraints:
+            fitness += constraint.teams(matches, kickoff)
+
+    if schedule_constraints:
+        classic = problem.classic
+        classics = [game for game in genome if classic[game]]
+        for constraint in schedule_constraints:
+            fitness += constraint.schedule(genome, slot, classics)
+    return fitness
@@ -0,0 +1,155 @@
+from bisect import insort
+
+# Largest move worth scoring incrementally: every changed position costs a
+# fifth to a quarter of a full scoring, see Individual.apply_move
+MAX_DELTA_POSITIONS = 4
+
+
+class FitnessState:
+    """Incremental fitness of one schedule.
+
+    Keeps the positions of every match and of every team, the pair counts and
+    the positions of the classics, together with the fitness contribution of
+    every team and of every "schedule" constraint (see constraints.py). A move
+    only rescores the teams playing the matches it touches, and the schedule
+    constraints involving those matches, instead of the whole schedule. The
+    fitness is always equal to Individual.get_fitness.
+
+    Moves are given as a dict {position: match ID} and are written into the
+    genome the state was built from.
+    """
+
+    def __init__(self, genome, problem):
+        self.genome = genome
+        self.home, self.away, self.pair, self.classic = problem.home, problem.away, problem.pair, problem.classic
+        self.time = problem.slot_time
+        self.pair_weight = problem.pair_weight
+        self.team_constraints = problem.team_constraints
+        self.schedule_constraints = problem.schedule_constraints
+
+        self.occurrences = {}
+        self.slot = [0] * problem.n_matches
+        self.kickoff = [0] * problem.n_matches
+        self.team_positions = [[] for _ in problem.teams]
+        self.pair_count = {}
+        self.classic_positions = []
+        for position, game in enumerate(genome):
+            self.occurrences.setdefault(game, []).append(position)
+            self.slot[game] = position
+            self.kickoff[game] = self.time[position]
+            self.team_positions[self.home[game]].append(position)
+            self.team_positions[self.away[game]].append(position)
+            self.pair_count[self.pair[game]] = self.pair_count.get(self.pair[game], 0) + 1
+            if self.classic[game]:
+                self.classic_positions.append(position)
+
+        self.pair_violations = sum(1 for count in self.pair_count.values() if count != 2)
+        self.team_score = [self._team_score(team) for team in range(problem.n_teams)]
+        self.schedule_score = [self._schedule_score(constraint) for constraint in self.schedule_constraints]
+        self.fitness = self._total()
+
+    def copy(self, genome):
+        """Copy the state for a copy of its genome."""
+        state = object.__new__(FitnessState)
+        state.__dict__.update(self.__dict__)
+        state.genome = genome
+        state.occurrences = {game: positions[:] for game, positions in self.occurrences.items()}
+        state.slot = self.slot[:]
+        state.kickoff = self.kickoff[:]
+        state.team_positions = [positions[:] for positions in self.team_positions]
+        state.pair_count = self.pair_count.copy()
+        state.classic_positions = self.classic_positions[:]
+        state.team_score = self.team_score[:]
+        state.schedule_score = self.schedule_score[:]
+        return state
+
+    def _total(self):
+        return self.pair_weight * self.pair_violations + sum(self.team_score) + sum(self.schedule_score)
+
+    def _team_score(self, team):
+        genome = self.genome
+        games = [genome[position] for position in self.team_positions[team]]
+        score = 0
+        for constraint in self.team_constraints:
+            score += constraint.team(team, games, self.kickoff)
+        return score
+
+    def _schedule_score(self, constraint):
+        classics = [self.genome[position] for position in self.classic_positions]
+        return constraint.schedule(self.genome, self.slot, classics)
+
+    def _count_pair(self, pair, change):
+        count = self.pair_count.get(pair, 0)
+        if count:
+            self.pair_violations -= count != 2
+        count += change
+        if count:
+            self.pair_violations += count != 2
+            self.pair_count[pair] = count
+        else:
+            del self.pair_count[pair]
+
+    def apply(self, changes):
+        """Apply a move to the genome and update the fitness.
+
+        Args:
+            changes (dict): New match ID of every position the move changes.
+
+        Returns:
+            int: The fitness after the move.
+        """
+        teams = set()
+        games = set()
+        for position, game in changes.items():
+            old = self.genome[position]
+            if old == game:
+                continue
+            self.genome[position] = game
+
+            self.occurrences[old].remove(position)
+            # Repeated matches are all dated by their last occurrence
+            if self.occurrences[old]:
+                self.slot[old] = self.occurrences[old][-1]
+                self.kickoff[old] = self.time[self.slot[old]]
+            else:
+                del self.occurrences[old]
+            insort(self.occurrences.setdefault(game, []), position)
+            self.slot[game] = self.occurrences[game][-1]
+            self.kickoff[game] = self.time[self.slot[game]]
+
+            for team in (self.home[old], self.away[old]):
+                self.team_positions[team].remove(position)
+                teams.add(team)
+            for team in (self.home[game], self.away[game]):
+                insort(self.team_positions[team], position)
+                teams.add(team)
+
+            self._count_pair(self.pair[old], -1)
+            self._count_pair(self.pair[game], 1)
+
+            if self.classic[old]:
+                self.classic_positions.remove(position)
+            if self.classic[game]:
+                insort(self.classic_positions, position)
+            games.update((old, game))
+
+        for team in teams:
+            self.team_score[team] = self._team_score(team)
+        for i, constraint in enumerate(self.schedule_constraints):
+            if any(constraint.involves(game) for game in games):
+                self.schedule_score[i] = self._schedule_score(constraint)
+        self.fitness = self._total()
+        return self.fitness
+
+    def violated_positions(self):
+        """Positions of the games of every team losing points to a team constraint (weekend clash, away streak)."""
+        return sorted({position for team, score in enumerate(self.team_score) if score < 0
+                       for position in self.team_positions[team]})
+
+    def delta(self, changes):
+        """Fitness change a move would cause, leaving the genome as it is."""
+        undo = {position: self.genome[position] for position in changes}
+        before = self.fitness
+        after = self.apply(changes)
+        self.apply(undo)
+        return after - before
@@ -0,0 +1,73 @@
+from heapq import heappush, heapreplace
+from math import sqrt
+
+
+class TopK:
+    """The k fittest individuals of a generation, kept up to date as individuals are scored.
+
+    A min-heap of size k holds the current top k, so every offer costs
+    O(log k) and the best individual, the elites and the mean and standard
+    deviation of the fitness are read in O(1) or O(k), without scanning the
+    population again. Population.evaluate offers the individuals of a
+    generation as they are scored. Ties are broken by order of arrival, as
+    max and sorted do.
+
+    Attributes:
+        count (int): Individuals offered.
+        total (int): Sum of their fitness.
+        total_squares (int): Sum of the squares of their fitness.
+    """
+
+    def __init__(self, k, individuals=()):
+        """
+        Args:
+            k (int): Number of individuals to keep, at least 1.
+            individuals (list): Scored individuals to offer right away.
+        """
+        self.k = max(1, k)
+        self.count = 0
+        self.total = 0
+        self.total_squares = 0
+        self._heap = []
+        self._best = None
+        for individual in individuals:
+            self.offer(individual)
+
+    def offer(self, individual):
+        """Add a scored individual, keeping it if it is among the k fittest so far."""
+        fitness = individual.fitness
+        # Later arrivals rank lower among equal fitness
+        entry = (fitness, -self.count, individual)
+        self.count += 1
+        self.total += fitness
+        self.total_squares += fitness * fitness
+        if self._best is None or fitness > self._best.fitness:
+            self._best = individual
+        if len(self._heap) < self.k:
+            heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapreplace(self._heap, entry)
+
+    @property
+    def best(self):
+        """The fittest individual, the first one offered among equals."""
+        return self._best
+
+    @property
+    def mean(self):
+        """Mean fitness of the individuals offered."""
+        return self.total / self.count
+
+    @property
+    def std(self):
+        """Standard deviation of the fitness of the individuals offered."""
+        # Exact in integers before the square root
+        return sqrt(max(self.count * self.total_squares - self.total * self.total, 0)) / self.count
+
+    def elites(self, n=None):
+        """The n fittest individuals (k by default), fittest first."""
+        elites = [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+        return elites if n is None else elites[:n]
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,178 @@
+import numpy as np
+from constraints import (DAY, PairCount, AwayStreak, WeekendClash, ClassicPrimeTime, ClassicBalance, ClassicSpacing, Derby,
+                         StadiumSharing, score)
+
+# Fewer genomes than this are faster to score one by one with score, see Population.evaluate
+MIN_BATCH = 8
+
+
+class BatchFitness:
+    """Vectorized fitness of a whole population of schedules.
+
+    Scores an (N, n_games) matrix of match IDs with the constraints of the
+    problem (see constraints.py), giving the same values as
+    Individual.get_fitness, including for schedules with repeated matches (a
+    repeated match takes the date of its last occurrence, as in the
+    original get_fitness). Every constraint class has a kernel in
+    kernels; constraints without one are scored row by row.
+
+    Args:
+        problem (ProblemInstance): The compiled scheduling problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.n_teams = problem.n_teams
+        self.n_matches = problem.n_matches
+        self.n_pairs = problem.n_teams * problem.n_teams
+        self.home = np.array(problem.home, dtype=np.intp)
+        self.away = np.array(problem.away, dtype=np.intp)
+        self.pair = np.array(problem.pair, dtype=np.intp)
+        self.classic = np.frombuffer(problem.classic, dtype=np.uint8).astype(bool)
+        self.weekday = np.array(problem.slot_weekday)
+        self.time = np.array(problem.slot_time, dtype=np.int64)
+        # Weekends and days of the calendar, numbered from 0
+        self.weekend = np.unique(problem.slot_weekend, return_inverse=True)[1].reshape(-1)
+        self.day = np.unique(problem.slot_day, return_inverse=True)[1].reshape(-1)
+
+    def __call__(self, genomes):
+        """Score every schedule of a population.
+
+        Args:
+            genomes (array-like): (N, n_games) matrix of match IDs, one row per schedule.
+
+        Returns:
+            numpy.ndarray: The fitness of every row, as int64.
+        """
+        genomes = np.asarray(genomes, dtype=np.intp)
+        n, length = genomes.shape
+        self.genomes = genomes
+        self.n = n
+        self.rows = np.arange(n)[:, None]
+        self.positions = np.broadcast_to(np.arange(length), genomes.shape)
+
+        # Date slot of every game: repeated matches are all mapped to their last occurrence
+        last = np.full((n, self.n_matches), -1, dtype=np.intp)
+        np.maximum.at(last, (np.broadcast_to(self.rows, genomes.shape), genomes), self.positions)
+        self.slots = last[self.rows, genomes]
+        self.classics = self.classic[genomes]
+        self._team_entries = None
+
+        fitness = np.zeros(n, dtype=np.int64)
+        for constraint in self.problem.constraints:
+            kernel = kernels.get(type(constraint))
+            if kernel is None:
+                fitness += [score(self.problem, genome, [constraint]) for genome in genomes]
+            else:
+                fitness += kernel(self, constraint)
+        self.genomes = self.slots = self.classics = self._team_entries = None
+        return fitness
+
+    def team_entries(self):
+        """Games of every team in schedule order, computed once per call.
+
+        Returns:
+            tuple: (N, 2 * n_games) arrays of the team, away flag and kickoff of every entry, sorted by
+            (team, position), and whether every entry has the same team as the previous one.
+        """
+        if self._team_entries is None:
+            n, length = self.genomes.shape
+            team = np.stack([self.home[self.genomes], self.away[self.genomes]], axis=2).reshape(n, 2 * length)
+            is_away = np.tile(np.array([False, True]), length)
+            entry_slot = np.repeat(self.slots, 2, axis=1)
+            order = np.argsort(team * length + np.repeat(self.positions, 2, axis=1), axis=1)
+            team = np.take_along_axis(team, order, axis=1)
+            is_away = is_away[order]
+            entry_time = self.time[np.take_along_axis(entry_slot, order, axis=1)]
+            same_team = team[:, 1:] == team[:, :-1]
+            self._team_entries = team, is_away, entry_time, same_team
+        return self._team_entries
+
+
+def _pair_count(batch, constraint):
+    # Check if all teams play together twice (once at home and once away)
+    pair_count = np.bincount((batch.pair[batch.genomes] + batch.rows * batch.n_pairs).ravel(),
+                             minlength=batch.n * batch.n_pairs).reshape(batch.n, batch.n_pairs)
+    return constraint.weight * ((pair_count > 0) & (pair_count != 2)).sum(axis=1)
+
+
+def _away_streak(batch, constraint):
+    # No team plays more than max_streak consecutive away games: the last max_streak + 1 games of the team are away
+    _, is_away, _, same_team = batch.team_entries()
+    k, length = constraint.max_streak, is_away.shape[1]
+    streak = is_away[:, k:].copy()
+    for j in range(1, k + 1):
+        streak &= is_away[:, k - j:length - j] & same_team[:, k - j:length - j]
+    return constraint.weight * streak.sum(axis=1)
+
+
+def _weekend_clash(batch, constraint):
+    # No team plays more than once in one weekend
+    _, _, entry_time, same_team = batch.team_entries()
+    days = (entry_time[:, 1:] - entry_time[:, :-1]) // DAY
+    return constraint.weight * (same_team & (np.abs(days) < constraint.min_days)).sum(axis=1)
+
+
+def _on_prime_day(batch, constraint):
+    return batch.weekday[batch.slots] == constraint.prime_day
+
+
+def _classic_prime_time(batch, constraint):
+    # Classics should be on prime time
+    on_prime_day = _on_prime_day(batch, constraint)
+    return (constraint.saturday * (batch.classics & on_prime_day).sum(axis=1)
+            + constraint.other * (batch.classics & ~on_prime_day).sum(axis=1))
+
+
+def _classic_balance(batch, constraint):
+    # Balance of Saturday and Sunday classics for every team
+    balance = np.where(_on_prime_day(batch, constraint), 1, -1) * batch.classics
+    offsets = batch.rows * batch.n_teams
+    size = batch.n * batch.n_teams
+    balance = (np.bincount((batch.home[batch.genomes] + offsets).ravel(), weights=balance.ravel(), minlength=size)
+               + np.bincount((batch.away[batch.genomes] + offsets).ravel(), weights=balance.ravel(), minlength=size))
+    difference = np.abs(balance.reshape(batch.n, batch.n_teams)).sum(axis=1).astype(np.int64)
+    return constraint.weight * np.minimum(constraint.cap, constraint.cap - difference)
+
+
+def _classic_spacing(batch, constraint):
+    # Interval between every classic and the next one in the schedule
+    n, length = batch.genomes.shape
+    following = np.where(batch.classics, batch.positions, length)
+    following = np.minimum.accumulate(following[:, ::-1], axis=1)[:, ::-1]
+    following = np.concatenate([following[:, 1:], np.full((n, 1), length)], axis=1)
+    has_next = batch.classics & (following < length)
+    next_slot = np.take_along_axis(batch.slots, np.minimum(following, length - 1), axis=1)
+    interval = (batch.time[next_slot] - batch.time[batch.slots]) // DAY
+    return (constraint.rest_bonus * (has_next & (interval > constraint.rest_days)).sum(axis=1)
+            + constraint.week_bonus * (has_next & (interval <= constraint.rest_days)
+                                       & (interval >= constraint.week_days)).sum(axis=1))
+
+
+def _derby(batch, constraint):
+    # Derbies over the limit in every weekend
+    derby = np.frombuffer(constraint._derby, dtype=np.uint8).astype(bool)[batch.genomes]
+    n_weekends = batch.weekend.max() + 1
+    keys = batch.rows * n_weekends + batch.weekend[batch.slots]
+    counts = np.bincount(keys[derby], minlength=batch.n * n_weekends).reshape(batch.n, n_weekends)
+    return constraint.weight * np.maximum(counts - constraint.max_per_weekend, 0).sum(axis=1)
+
+
+def _stadium_sharing(batch, constraint):
+    # Home games in a shared stadium on the same day, beyond the first
+    stadium = np.array(constraint._stadium, dtype=np.intp)[batch.home[batch.genomes]]
+    shared = stadium >= 0
+    n_stadiums, n_days = max(len(constraint.stadiums), 1), batch.day.max() + 1
+    keys = (batch.rows * n_stadiums + stadium) * n_days + batch.day[batch.slots]
+    counts = np.bincount(keys[shared], minlength=batch.n * n_stadiums * n_days).reshape(batch.n, -1)
+    return constraint.weight * np.maximum(counts - 1, 0).sum(axis=1)
+
+
+kernels = {PairCount: _pair_count, AwayStreak: _away_streak, WeekendClash: _weekend_clash,
+           ClassicPrimeTime: _classic_prime_time, ClassicBalance: _classic_balance, ClassicSpacing: _classic_spacing,
+           Derby: _derby, StadiumSharing: _stadium_sharing}
+
+
+def genome_matrix(individuals):
+    """Stack the genomes of some individuals into an (N, n_games) match-ID matrix."""
+    return np.vstack([np.frombuffer(individual.genome, dtype=np.uint16) for individual in individuals])
@@ -0,0 +1,56 @@
+from array import array
+from functools import lru_cache
+
+# Match IDs fit comfortably in an unsigned short: a 20-team league has 380 fixtures.
+GENOME_TYPECODE = "H"
+
+
+@lru_cache(maxsize=None)
+def match_table(teams):
+    """Build the fixture table of a league.
+
+    Match IDs follow the order of the valid sets in Data.py, i.e. the ID of
+    (home, away) is its position in
+    [[home, away] for home in teams for away in teams if home != away].
+
+    Args:
+        teams (tuple): Team names of the league.
+
+    Returns:
+        tuple: The (home, away) pair of every match ID and a dict mapping each pair back to its ID.
+    """
+    matches = tuple((home, away) for home in teams for away in teams if home != away)
+    index = {match: match_id for match_id, match in enumerate(matches)}
+    return matches, index
+
+
+def match_id(game, teams):
+    """Return the match ID of a game given either as an ID or as a [home, away] pair."""
+    if isinstance(game, int):
+        return game
+    return match_table(tuple(teams))[1][tuple(game)]
+
+
+def encode(representation, teams):
+    """Encode a schedule into a compact genome.
+
+    Args:
+        representation: A sequence of match IDs or of [home, away] pairs.
+        teams (list): Team names of the league.
+
+    Returns:
+        array: The schedule as an array('H') of match IDs. Genomes are returned as they are, without copying.
+    """
+    if isinstance(representation, array) and representation.typecode == GENOME_TYPECODE:
+        return representation
+    try:
+        return array(GENOME_TYPECODE, representation)
+    except TypeError:
+        index = match_table(tuple(teams))[1]
+        return array(GENOME_TYPECODE, [game if isinstance(game, int) else index[tuple(game)] for game in representation])
+
+
+def decode(genome, teams):
+    """Decode a genome back into a list of [home, away] pairs."""
+    matches = match_table(tuple(teams))[0]
+    return [list(matches[game]) for game in genome]
@@ -0,0 +1,134 @@
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from charles import Individual, Population
+from genome import GENOME_TYPECODE
+from problem import ProblemInstance
+
+
+def _evolve_island(state, problem, gens, elitism, xo_prob, mut_prob, select, crossover, mutate):
+    """Evolve one island for some generations in a worker process.
+
+    The island travels between processes as its genomes, their fitness and
+    the state of its random generator, so every epoch continues the island's
+    own random stream.
+    """
+    random.setstate(state["rng"])
+    individuals = []
+    for genome, fitness in zip(state["genomes"], state["fitness"]):
+        individual = Individual(problem=problem, representation=array(GENOME_TYPECODE, genome))
+        individual.fitness = fitness
+        individuals.append(individual)
+
+    P = Population(size=len(individuals), teams=list(problem.teams), elitism=elitism, individuals=individuals,
+                   problem=problem)
+    _, fitness_list = P.evolve(gens=gens, xo_prob=xo_prob, mut_prob=mut_prob, select=select,
+                               mutate=mutate, crossover=crossover, observers=[])
+
+    return {
+        "genomes": [individual.genome.tobytes() for individual in P.individuals],
+        "fitness": [individual.fitness for individual in P.individuals],
+        "rng": random.getstate(),
+    }, fitness_list
+
+
+def _initial_state(size, problem, seed):
+    rng_state = random.getstate()
+    random.seed(seed)
+    individuals = Population(size=size, teams=list(problem.teams), problem=problem).individuals
+    state = {
+        "genomes": [individual.genome.tobytes() for individual in individuals],
+        "fitness": [individual.fitness for individual in individuals],
+        "rng": random.getstate(),
+    }
+    random.setstate(rng_state)
+    return state
+
+
+def _migrate(states, migrants, topology, rng):
+    """Send the best individuals of every island to its neighbour, replacing the neighbour's worst ones.
+
+    Returns:
+        tuple: For every island, the number of migrants it received and whether one of them beats its own best individual.
+    """
+    if topology == "ring":
+        targets = [(i + 1) % len(states) for i in range(len(states))]
+    elif topology == "random":
+        targets = [rng.choice([j for j in range(len(states)) if j != i]) for i in range(len(states))]
+    else:
+        raise ValueError(f"Unknown topology: {topology}")
+
+    outgoing = []
+    for state in states:
+        best = sorted(range(len(state["fitness"])), key=state["fitness"].__getitem__, reverse=True)[:migrants]
+        outgoing.append([(state["genomes"][i], state["fitness"][i]) for i in best])
+
+    received = [0] * len(states)
+    improved = [False] * len(states)
+    for source, target in enumerate(targets):
+        state = states[target]
+        best_fitness = max(state["fitness"])
+        worst = sorted(range(len(state["fitness"])), key=state["fitness"].__getitem__)[:migrants]
+        for i, (genome, fitness) in zip(worst, outgoing[source]):
+            state["genomes"][i] = genome
+            state["fitness"][i] = fitness
+            received[target] += 1
+            improved[target] = improved[target] or fitness > best_fitness
+    return received, improved
+
+
+def run_islands(islands, teams, gens, migration_interval=10, migrants=2, topology="ring", size=50, elitism=True,
+                xo_prob=0.9, mut_prob=0.2, seed=0, workers=None, problem=None):
+    """Island model: several populations evolving in separate processes, exchanging their best individuals.
+
+    Every island evolves with its own operators for migration_interval
+    generations, then the islands send their top individuals to a neighbour
+    (the next island on a ring, or a random one) where they replace the worst.
+
+    Args:
+        islands (list): (select, crossover, mutate) functions of every island, from selection.py, xo.py and mutation.py.
+        teams (list): Team names of the league.
+        gens (int): Number of generations of every island.
+        migration_interval (int): Generations between migrations.
+        migrants (int): Individuals every island sends at each migration.
+        topology (str): "ring" or "random".
+        size (int): Population size of every island.
+        elitism (bool): Whether the islands keep their best individual.
+        xo_prob (float): Crossover probability.
+        mut_prob (float): Mutation probability.
+        seed (int): Seed of the whole run.
+        workers (int): Number of processes, one per island by default.
+        problem (ProblemInstance): Compiled problem of the league, with its calendar and classics,
+            ProblemInstance.get(teams) by default. Leagues of more than 10 teams need a longer calendar.
+
+    Returns:
+        tuple: Best fitness over all islands, and the metrics of every island as dicts with the best
+        fitness of every generation, the number of migrants received and the number of migrations
+        that brought in a new best individual.
+    """
+    problem = ProblemInstance.get(teams) if problem is None else problem
+    rng = random.Random(seed)
+    states = [_initial_state(size, problem, rng.getrandbits(32)) for _ in islands]
+    metrics = [{"select": select.__name__, "crossover": crossover.__name__, "mutate": mutate.__name__,
+                "fitness_list": [], "migrants_received": 0, "improving_migrations": 0}
+               for select, crossover, mutate in islands]
+
+    with ProcessPoolExecutor(max_workers=workers or len(islands)) as executor:
+        done = 0
+        while done < gens:
+            epoch = min(migration_interval, gens - done)
+            futures = [executor.submit(_evolve_island, state, problem, epoch, elitism, xo_prob, mut_prob, *operators)
+                       for state, operators in zip(states, islands)]
+            for i, future in enumerate(futures):
+                states[i], fitness_list = future.result()
+                metrics[i]["fitness_list"].extend(fitness_list)
+            done += epoch
+
+            if done < gens and len(states) > 1:
+                received, improved = _migrate(states, migrants, topology, rng)
+                for island, count, gain in zip(metrics, received, improved):
+                    island["migrants_received"] += count
+                    island["improving_migrations"] += gain
+
+    best_fitness = max(max(state["fitness"]) for state in states)
+    return best_fitness, metrics
@@ -0,0 +1,62 @@
+from heapq import nlargest
+from operator import attrgetter
+from random import choice, randrange
+
+
+def hill_climb(individual, budget=50):
+    """First-improvement hill climbing on the games breaking hard constraints.
+
+    Every step swaps a game of a team that breaks a team constraint (weekend
+    clash, away streak) with a random position, and keeps the swap if it
+    improves the fitness. Moves are scored incrementally, see
+    Individual.apply_move.
+
+    Args:
+        individual (Individual): The individual to improve, in place.
+        budget (int): Number of moves to try.
+
+    Returns:
+        int: Number of moves tried, less than the budget if no team breaks a constraint anymore.
+    """
+    violated = individual.violated_positions()
+    tried = 0
+    while violated and tried < budget:
+        tried += 1
+        position, other = choice(violated), randrange(len(individual))
+        if position == other:
+            continue
+        fitness = individual.fitness
+        move = {position: individual[other], other: individual[position]}
+        individual.apply_move(move)
+        if individual.fitness > fitness:
+            violated = individual.violated_positions()
+        else:
+            individual.apply_move({position: move[other], other: move[position]})
+    return tried
+
+
+class LocalSearch:
+    """Memetic stage of Population.evolve, improving the best offspring of every generation.
+
+    Pass an instance as evolve(..., local_search=LocalSearch()).
+
+    Attributes:
+        moves (int): Moves tried so far, over all generations.
+    """
+
+    def __init__(self, top_k=5, budget=50, method=hill_climb):
+        """
+        Args:
+            top_k (int): Number of offspring to improve every generation, the fittest ones.
+            budget (int): Moves tried on every one of them.
+            method (function): The local search, method(individual, budget) returning the moves tried.
+        """
+        self.top_k = top_k
+        self.budget = budget
+        self.method = method
+        self.moves = 0
+
+    def __call__(self, offspring):
+        """Improve the top_k fittest of some offspring in place."""
+        for individual in nlargest(self.top_k, offspring, key=attrgetter("fitness")):
+            self.moves += self.method(individual, self.budget)
@@ -3,6 +3,19 @@ from Data import teams
 from charles import Individual
 
 
+def window_move(start, genes):
+    """Build the move that writes some genes from a start position onwards.
+
+    Args:
+        start (int): First position of the window.
+        genes: Match IDs to write into the window.
+
+    Returns:
+        dict: New match ID of every position of the window, as expected by Individual.apply_move.
+    """
+    return dict(zip(range(start, start + len(genes)), genes))
+
+
 def swap_mutation(individual):
     """Swap mutation for a scheduling problem Individual
 
@@ -14,7 +27,7 @@ def swap_mutation(individual):
     """
 
     mut_indexes = sample(range(0, len(individual)), 2)
-    individual[mut_indexes[0]], individual[mut_indexes[1]] = individual[mut_indexes[1]], individual[mut_indexes[0]]
+    individual.apply_move({mut_indexes[0]: individual[mut_indexes[1]], mut_indexes[1]: individual[mut_indexes[0]]})
     return individual
 
 def insertion_mutation(individual):
@@ -26,10 +39,11 @@ def insertion_mutation(individual):
     Returns:
         Individual: Mutated Individual
     """
-    mut_indexes = sample(range(len(individual.representation)), 2)
+    mut_indexes = sample(range(len(individual)), 2)
     mut_indexes.sort()
-    gene = individual.representation.pop(mut_indexes[1])
-    individual.representation.insert(mut_indexes[0], gene)
+    window = individual.genome[mut_indexes[0]:mut_indexes[1] + 1]
+    window.insert(0, window.pop())
+    individual.apply_move(window_move(mut_indexes[0], window))
     return individual
 
 def inversion_mutation(individual):
@@ -41,9 +55,9 @@ def inversion_mutation(individual):
     Returns:
         Individual: Mutated Individual
     """
-    mut_indexes = sample(range(len(individual.representation)), 2)
+    mut_indexes = sample(range(len(individual)), 2)
     start, end = min(mut_indexes), max(mut_indexes)
-    individual.representation[start:end] = reversed(individual.representation[start:end])
+    individual.apply_move(window_move(start, individual.genome[start:end][::-1]))
 
     return individual
 
@@ -57,11 +71,11 @@ def scramble_mutation(individual):
     Returns:
         Individual: Mutated Individual
     """
-    mut_indexes = sample(range(len(individual.representation)), 2)
+    mut_indexes = sample(range(len(individual)), 2)
     start, end = min(mut_indexes), max(mut_indexes)
-    subset = individual.representation[start:end]
+    subset = individual.genome[start:end]
     shuffle(subset)
-    individual.representation[start:end] = subset
+    individual.apply_move(window_move(start, subset))
 
     return individual
 
@@ -76,12 +90,14 @@ def displacement_mutation(individual):
     Returns:
         Individual: Mutated Individual
     """
-    mut_indexes = sample(range(len(individual.representation)), 2)
+    mut_indexes = sample(range(len(individual)), 2)
     start, end = min(mut_indexes), max(mut_indexes)
-    subset = individual.representation[start:end]
-    del individual.representation[start:end]
-    insert_index = randint(0, len(individual.representation))
-    individual.representation[insert_index:insert_index] = subset
+    subset = individual.genome[start:end]
+    rest = individual.genome[:start] + individual.genome[end:]
+    insert_index = randint(0, len(rest))
+    displaced = rest[:insert_index] + subset + rest[insert_index:]
+    first = min(start, insert_index)
+    individual.apply_move(window_move(first, displaced[first:max(end, insert_index + len(subset))]))
 
     return individual
 
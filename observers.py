@@ -0,0 +1,118 @@
+import json
+import sys
+from math import sqrt
+from time import monotonic
+
+
+class Observer:
+    """Receives the progress of Population.evolve.
+
+    Subclass it and override the methods you need; the default ones do
+    nothing, so Observer() itself is a silent observer.
+    """
+
+    def on_generation(self, population, gen, best):
+        """Called after every generation.
+
+        Args:
+            population (Population): The population, holding the new generation.
+            gen (int): Number of the generation, counted from 1.
+            best (Individual): Best individual of the generation.
+        """
+
+    def on_improvement(self, population, gen, best):
+        """Called after a generation whose best individual beats every previous generation."""
+
+    def on_finish(self, population, best_fitness, fitness_list):
+        """Called once the run is over, with what evolve returns."""
+
+
+class SilentObserver(Observer):
+    """Reports nothing."""
+
+
+class ConsoleObserver(Observer):
+    """Prints the best fitness of the generations, at most every interval seconds.
+
+    The first and the last generation are always printed.
+    """
+
+    def __init__(self, every=1, interval=1.0, individual=False, stream=None):
+        """
+        Args:
+            every (int): Print at most every this many generations.
+            interval (float): Print at most every this many seconds.
+            individual (bool): Whether to print the whole best individual rather than its fitness.
+            stream (file): Where to print, sys.stdout by default.
+        """
+        self.every = every
+        self.interval = interval
+        self.individual = individual
+        self.stream = stream
+        self._last = None
+        self._pending = None
+
+    def on_generation(self, population, gen, best):
+        now = monotonic()
+        if self._last is not None and (gen % self.every or now - self._last < self.interval):
+            self._pending = (gen, best)
+            return
+        self._last = now
+        self._pending = None
+        self._print(gen, best)
+
+    def on_finish(self, population, best_fitness, fitness_list):
+        if self._pending is not None:
+            self._print(*self._pending)
+        self._last = self._pending = None
+        if population.stop_reason:
+            print(f"Stopped: {population.stop_reason}", file=self.stream or sys.stdout)
+
+    def _print(self, gen, best):
+        shown = best if self.individual else f"Fitness: {best.fitness}"
+        print(f"Best individual of gen #{gen}: {shown}", file=self.stream or sys.stdout)
+
+
+class JsonlMetricsWriter(Observer):
+    """Streams the metrics of every generation to a JSON Lines file.
+
+    Every line holds the generation, the best, mean and standard deviation of
+    the fitness and the diversity, the share of distinct schedules in the
+    population. The run ends with a line holding the best fitness.
+    """
+
+    def __init__(self, path, flush_every=10, **fields):
+        """
+        Args:
+            path (str): File to write, appended to if it exists.
+            flush_every (int): Generations between flushes of the file.
+            fields: Values added to every line, e.g. the operators or the seed of the run.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.fields = fields
+        self._file = None
+
+    def on_generation(self, population, gen, best):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        top = population.top
+        if top is not None and top.count == len(population.individuals):
+            # Kept by evolve as the generation is scored, see elites.TopK
+            mean, std = top.mean, top.std
+        else:
+            fitness = [individual.fitness for individual in population.individuals]
+            mean = sum(fitness) / len(fitness)
+            std = sqrt(sum((f - mean) ** 2 for f in fitness) / len(fitness))
+        diversity = len({individual.genome.tobytes() for individual in population.individuals}) / len(population)
+        self._file.write(json.dumps(dict(self.fields, gen=gen, best=best.fitness, mean=mean, std=std,
+                                         diversity=diversity)) + "\n")
+        if gen % self.flush_every == 0:
+            self._file.flush()
+
+    def on_finish(self, population, best_fitness, fitness_list):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(dict(self.fields, best_fitness=best_fitness)) + "\n")
+        self._file.close()
+        self._file = None
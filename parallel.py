@@ -0,0 +1,56 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from fitness import BatchFitness
+
+# Evaluator of the worker process, built once from the problem data sent by the initializer
+_evaluator = None
+
+
+def _init_worker(problem):
+    global _evaluator
+    _evaluator = BatchFitness(problem)
+
+
+def _score_chunk(genomes, length):
+    return _evaluator(np.frombuffer(genomes, dtype=np.uint16).reshape(-1, length)).tolist()
+
+
+def evaluation_pool(problem, workers=None):
+    """Create a process pool for scoring schedules.
+
+    The problem (league, calendar and classics) is sent to every worker once,
+    when it starts; afterwards only genomes and fitness values travel between
+    processes.
+
+    Args:
+        problem (ProblemInstance): The compiled scheduling problem.
+        workers (int): Number of worker processes, one per CPU by default.
+
+    Returns:
+        ProcessPoolExecutor: Pool to pass to score_parallel or Population.evolve.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(problem,))
+
+
+def score_parallel(executor, genomes, chunk_size=None):
+    """Score genomes in an evaluation pool, in chunks.
+
+    Args:
+        executor (ProcessPoolExecutor): Pool created by evaluation_pool.
+        genomes (list): Genomes of equal length to score.
+        chunk_size (int): Genomes per task, by default enough for about four tasks per CPU.
+
+    Returns:
+        list: Fitness of every genome, in order.
+    """
+    if not genomes:
+        return []
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(genomes) // (4 * (os.cpu_count() or 1))))
+    chunks = [b"".join(genome.tobytes() for genome in genomes[i:i + chunk_size])
+              for i in range(0, len(genomes), chunk_size)]
+    fitness = []
+    for scores in executor.map(_score_chunk, chunks, [len(genomes[0])] * len(chunks)):
+        fitness.extend(scores)
+    return fitness
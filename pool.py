@@ -0,0 +1,47 @@
+from charles import Individual
+
+
+class GenomePool:
+    """Two preallocated generations of individuals, swapped every generation.
+
+    Population.evolve(..., pool=True) breeds every generation into the
+    individuals of the next buffer instead of creating new ones, so after
+    the first generation a run reuses the same individuals and genome
+    arrays. Crossovers still build the genes of their offspring in
+    temporary lists before copying them in. The rules are:
+
+        - the individuals of the current generation are read-only while the next one is bred;
+        - crossover writes its offspring into the next buffer (see xo.make_offspring), and parents
+          that skip crossover are copied into it (Individual.assign);
+        - the elite is copied into the next buffer as well, never shared between buffers.
+
+    Individuals of the pool are recycled two generations later: call
+    .copy() on one to keep it. Their incremental fitness states (see
+    delta.FitnessState) are released when their generation is retired.
+
+    Args:
+        problem (ProblemInstance): The compiled problem.
+        size (int): Number of individuals of a generation.
+    """
+
+    def __init__(self, problem, size):
+        self.size = size
+        # One spare individual, as offspring are bred in pairs
+        self.current = [Individual(problem=problem, repetition=True) for _ in range(size + 1)]
+        self.next = [Individual(problem=problem, repetition=True) for _ in range(size + 1)]
+
+    def load(self, individuals):
+        """Copy some individuals into the current buffer.
+
+        Returns:
+            list: The individuals of the current buffer holding the copies.
+        """
+        for slot, individual in zip(self.current, individuals):
+            slot.assign(individual)
+        return self.current[:len(individuals)]
+
+    def swap(self):
+        """Make the bred generation the current one, and recycle the previous one."""
+        for individual in self.current:
+            individual._state = None
+        self.current, self.next = self.next, self.current
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from functools import lru_cache
+from Data import random_game_dates_pt, CLASSICS
+from genome import match_table
+from constraints import DEFAULT_CONSTRAINTS, pair_weight
+
+
+class ProblemInstance:
+    """A league scheduling problem, compiled once into integer lookup tables.
+
+    Individuals, operators and evaluators share one instance instead of each
+    holding the team list and calendar, so the hot loops only index tuples.
+    Instances are immutable; use ProblemInstance.get to reuse the compiled
+    instance of a league.
+
+    Attributes:
+        teams (tuple): Team names; teams are referred to by their index.
+        fixtures (tuple): (home, away) names of every match ID, see genome.match_table.
+        index (dict): Match ID of every (home, away) pair of names.
+        home (tuple): Home team index of every match ID.
+        away (tuple): Away team index of every match ID.
+        pair (tuple): ID of the unordered pair of teams of every match ID.
+        classic (bytes): 1 for the match IDs of the classics, 0 otherwise.
+        game_dates (tuple): Kickoff of every date slot.
+        slot_weekday (tuple): Weekday of every slot (Monday is 0).
+        slot_day (tuple): Day ordinal of every slot.
+        slot_time (tuple): Kickoff of every slot in microseconds since the first slot.
+        slot_weekend (tuple): Weekend ID of every slot; slots of the same week share it.
+        constraints (tuple): The terms of the fitness function, compiled for this problem, see constraints.py.
+        constraint_config (tuple): The constraints as configured, before compilation.
+        team_constraints (tuple): The compiled constraints of kind "team".
+        schedule_constraints (tuple): The compiled constraints of kind "schedule".
+        pair_weight (int): Points per pair of teams not meeting exactly twice, see constraints.pair_weight.
+    """
+
+    __slots__ = ("teams", "fixtures", "index", "home", "away", "pair", "classic", "classics",
+                 "game_dates", "slot_weekday", "slot_day", "slot_time", "slot_weekend", "constraints", "constraint_config",
+                 "team_constraints", "schedule_constraints", "pair_weight")
+
+    def __init__(self, teams, game_dates=random_game_dates_pt, classics=CLASSICS, constraints=DEFAULT_CONSTRAINTS):
+        teams = tuple(teams)
+        fixtures, index = match_table(teams)
+        if len(game_dates) < len(fixtures):
+            raise ValueError(f"The calendar has {len(game_dates)} date slots but {len(fixtures)} matches to schedule")
+        team_index = {team: i for i, team in enumerate(teams)}
+        classics = tuple(tuple(classic) for classic in classics)
+        classic = bytearray(len(fixtures))
+        for match in classics:
+            if match in index:
+                classic[index[match]] = 1
+
+        origin = game_dates[0]
+        setattr_ = super().__setattr__
+        setattr_("teams", teams)
+        setattr_("fixtures", fixtures)
+        setattr_("index", index)
+        setattr_("home", tuple(team_index[home] for home, _ in fixtures))
+        setattr_("away", tuple(team_index[away] for _, away in fixtures))
+        setattr_("pair", tuple(min(h, a) * len(teams) + max(h, a) for h, a in zip(self.home, self.away)))
+        setattr_("classic", bytes(classic))
+        setattr_("classics", classics)
+        setattr_("game_dates", tuple(game_dates))
+        setattr_("slot_weekday", tuple(date.weekday() for date in game_dates))
+        setattr_("slot_day", tuple(date.toordinal() for date in game_dates))
+        setattr_("slot_time", tuple((date - origin) // timedelta(microseconds=1) for date in game_dates))
+        setattr_("slot_weekend", tuple(date.toordinal() - date.weekday() for date in game_dates))
+        setattr_("constraint_config", tuple(constraints))
+        setattr_("constraints", tuple(constraint.compile(self) for constraint in constraints))
+        # Grouped once here rather than on every scoring call
+        setattr_("team_constraints", tuple(constraint for constraint in self.constraints if constraint.kind == "team"))
+        setattr_("schedule_constraints", tuple(constraint for constraint in self.constraints
+                                               if constraint.kind == "schedule"))
+        setattr_("pair_weight", pair_weight(self.constraints))
+
+    @staticmethod
+    def get(teams, game_dates=None, classics=None, constraints=None):
+        """Return the shared compiled instance of a league, compiling it on first use.
+
+        Args:
+            teams (list): Team names of the league.
+            game_dates (list): Kickoff of every date slot, Data.random_game_dates_pt by default. There must be
+                at least one slot per match.
+            classics (list): Classic (home, away) matches, Data.CLASSICS by default.
+            constraints (list): Constraint objects of the fitness function, constraints.DEFAULT_CONSTRAINTS by default.
+
+        Returns:
+            ProblemInstance: The compiled problem.
+        """
+        return _compiled(tuple(teams), None if game_dates is None else tuple(game_dates),
+                         None if classics is None else tuple(tuple(classic) for classic in classics),
+                         None if constraints is None else tuple(constraints))
+
+    @property
+    def n_teams(self):
+        return len(self.teams)
+
+    @property
+    def n_matches(self):
+        return len(self.fixtures)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ProblemInstance is immutable")
+
+    def __reduce__(self):
+        # Sent to other processes as its definition and compiled again there
+        return _compiled, (self.teams, self.game_dates, self.classics, self.constraint_config)
+
+    def __repr__(self):
+        return f"ProblemInstance({self.n_teams} teams, {self.n_matches} matches, {len(self.game_dates)} slots)"
+
+
+@lru_cache(maxsize=None)
+def _compiled(teams, game_dates, classics, constraints=None):
+    return ProblemInstance(teams, random_game_dates_pt if game_dates is None else game_dates,
+                           CLASSICS if classics is None else classics,
+                           DEFAULT_CONSTRAINTS if constraints is None else constraints)
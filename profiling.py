@@ -0,0 +1,150 @@
+import cProfile
+import tracemalloc
+from time import perf_counter
+
+PHASES = ("selection", "crossover", "copy", "mutation", "evaluation", "local_search")
+
+
+class EvolveStats:
+    """Per-phase timings and counters of a Population.evolve run.
+
+    Pass an instance as evolve(..., stats=stats) and it is returned next to the
+    best fitness and the fitness list. The phases are:
+
+        selection: building the selection table and drawing the parents
+        crossover: crossover, including the construction of the offspring
+        copy: copying the parents that skip crossover
+        mutation: mutation, including the incremental fitness update
+        evaluation: scoring the new generation (cache, process pool, BatchFitness or get_fitness)
+        local_search: the memetic stage, if any (see local_search.py)
+
+    Optionally a range of generations runs under cProfile or tracemalloc and
+    the result is dumped to a file, to be read with pstats or
+    tracemalloc.Snapshot.load. With memory=True the whole run is traced by
+    tracemalloc, which slows it down a few times, to record how much memory
+    every generation allocates on top of what it started with, temporaries
+    included.
+
+    Attributes:
+        time (dict): Seconds spent in every phase.
+        evaluations (int): Full fitness evaluations (delta updates of mutations are not counted).
+        generations (int): Generations run.
+        peak_memory (list): With memory=True, the peak of the memory traced during every generation above
+            the memory traced when it started, in bytes.
+    """
+
+    def __init__(self, profile=None, profiler="cprofile", dump="evolve.prof", memory=False):
+        """
+        Args:
+            profile (tuple): (first, last) generations to profile, counted from 1, or None.
+            profiler (str): "cprofile" or "tracemalloc".
+            dump (str): File the profile is written to.
+            memory (bool): Whether to record the peak_memory of every generation.
+        """
+        if profiler not in ("cprofile", "tracemalloc"):
+            raise ValueError(f"Unknown profiler: {profiler}")
+        self.time = dict.fromkeys(PHASES, 0.0)
+        self.evaluations = 0
+        self.generations = 0
+        self.peak_memory = []
+        self.memory = memory
+        self.profile = profile
+        self.profiler = profiler
+        self.dump = dump
+        self._last = None
+        self._memory = None
+        self._profiler = None
+        self._profiling = False
+        self._tracing = False
+
+    def lap(self, phase):
+        """Add the time since the previous lap to a phase."""
+        now = perf_counter()
+        self.time[phase] += now - self._last
+        self._last = now
+
+    def start_generation(self, gen):
+        if self.profile is not None and not self._profiling and self.profile[0] <= gen + 1 <= self.profile[1]:
+            # Also when a resumed run starts past the first generation to profile
+            if self.profiler == "cprofile":
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            else:
+                self._trace()
+            self._profiling = True
+        if self.memory:
+            self._trace()
+            tracemalloc.reset_peak()
+            self._memory = tracemalloc.get_traced_memory()[0]
+        self._last = perf_counter()
+
+    def end_generation(self, gen):
+        self.generations += 1
+        if self.memory:
+            self.peak_memory.append(tracemalloc.get_traced_memory()[1] - self._memory)
+        if self._profiling and gen + 1 >= self.profile[1]:
+            self._stop_profile()
+
+    def finish(self):
+        """Stop profiling and dump the profile, if the run ends before the last generation to profile, and stop
+        tracing the memory.
+
+        Population.evolve calls it on every exit, normal or not.
+        """
+        self._stop_profile()
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _trace(self):
+        # Tracing started by someone else is left running
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def _stop_profile(self):
+        if not self._profiling:
+            return
+        self._profiling = False
+        if self.profiler == "cprofile":
+            self._profiler.disable()
+            self._profiler.dump_stats(self.dump)
+            self._profiler = None
+        else:
+            tracemalloc.take_snapshot().dump(self.dump)
+            if self._tracing and not self.memory:
+                tracemalloc.stop()
+                self._tracing = False
+
+    def summary(self):
+        """Seconds and share of the total time of every phase, and the counters."""
+        total = sum(self.time.values()) or 1
+        return {
+            "phases": {phase: {"seconds": seconds, "share": seconds / total} for phase, seconds in self.time.items()},
+            "evaluations": self.evaluations,
+            "generations": self.generations,
+            "peak_memory": max(self.peak_memory, default=None),
+        }
+
+    def __repr__(self):
+        phases = ", ".join(f"{phase}: {seconds:.3f}s" for phase, seconds in self.time.items())
+        return f"EvolveStats({self.generations} generations, {self.evaluations} evaluations, {phases})"
+
+
+class _NoStats:
+    """Stands in for EvolveStats when evolve runs without stats."""
+
+    def lap(self, phase):
+        pass
+
+    def start_generation(self, gen):
+        pass
+
+    def end_generation(self, gen):
+        pass
+
+    def finish(self):
+        pass
+
+
+NO_STATS = _NoStats()
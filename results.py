@@ -0,0 +1,170 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+
+# Every configuration of the study gets a directory of its own, nested in this order
+PARTITION_KEYS = ("elitism", "selection_func", "crossover_func", "mutation_func")
+
+SERIES = "fitness_list"
+
+
+class ResultsStore:
+    """Append-only, columnar store of the runs of an experiment sweep.
+
+    Runs are partitioned by configuration into nested key=value directories
+    (e.g. elitism=True/selection_func=fps/...), and every partition holds two
+    append-only files:
+
+        runs.csv: the scalar fields of every run (run, seed, best_fitness, ...), one line per run, with
+            the offset and length of its series.
+        fitness.i64: the per-generation series of every run, concatenated as raw int64.
+
+    A run is written as soon as it is appended. Before every append the
+    partition is brought back to its last complete run: a last line of
+    runs.csv cut short by a crash is dropped, and so is anything in
+    fitness.i64 past the series of that run. Reading a slice of the sweep,
+    e.g. read(selection_func="tournament_sel"), only opens the partitions it
+    matches.
+
+    Args:
+        root (str): Directory of the store, created on first append.
+        partition_by (tuple): Fields the runs are partitioned by.
+    """
+
+    def __init__(self, root, partition_by=PARTITION_KEYS):
+        self.root = root
+        self.partition_by = tuple(partition_by)
+
+    def partition(self, result):
+        """Directory of the partition of a run."""
+        return os.path.join(self.root, *(f"{key}={result[key]}" for key in self.partition_by))
+
+    def append(self, result):
+        """Persist one finished run.
+
+        Args:
+            result (dict): The partition fields, scalar fields and the fitness_list of the run.
+        """
+        directory = self.partition(result)
+        os.makedirs(directory, exist_ok=True)
+        runs_path = os.path.join(directory, "runs.csv")
+        series_path = os.path.join(directory, "fitness.i64")
+        offset = _repair(runs_path, series_path)
+
+        series = np.asarray(result[SERIES], dtype=np.int64)
+        with open(series_path, "ab") as f:
+            f.write(series.tobytes())
+
+        row = {key: value for key, value in result.items() if key not in self.partition_by and key != SERIES}
+        row.update(offset=offset, length=len(series))
+        new = not os.path.exists(runs_path) or os.path.getsize(runs_path) == 0
+        if new:
+            fields = list(row)
+        else:
+            with open(runs_path, newline="") as f:
+                fields = next(csv.reader(f))
+        with open(runs_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fields, extrasaction="ignore")
+            if new:
+                writer.writeheader()
+            writer.writerow(row)
+
+    def partitions(self, **filters):
+        """Configurations stored, as dicts of partition fields, optionally only those matching filters.
+
+        Filters are compared by their string form, so elitism=True matches the directory elitism=True.
+        """
+        def walk(directory, level, config):
+            if level == len(self.partition_by):
+                yield dict(config), directory
+                return
+            key = self.partition_by[level]
+            if not os.path.isdir(directory):
+                return
+            for name in sorted(os.listdir(directory)):
+                prefix, _, value = name.partition("=")
+                if prefix != key or (key in filters and str(filters[key]) != value):
+                    continue
+                yield from walk(os.path.join(directory, name), level + 1, config + [(key, value)])
+
+        unknown = set(filters) - set(self.partition_by)
+        if unknown:
+            raise ValueError(f"Not a partition field: {', '.join(sorted(unknown))}")
+        return walk(self.root, 0, [])
+
+    def runs(self, **filters):
+        """Scalar fields of the runs matching filters, without their series.
+
+        Returns:
+            pandas.DataFrame: One row per run, with the partition fields as strings.
+        """
+        tables = []
+        for config, directory in self.partitions(**filters):
+            table = _read_runs(os.path.join(directory, "runs.csv"))
+            for position, (key, value) in enumerate(config.items()):
+                table.insert(position, key, value)
+            tables.append(table)
+        if not tables:
+            return pd.DataFrame(columns=list(self.partition_by))
+        return pd.concat(tables, ignore_index=True)
+
+    def read(self, **filters):
+        """Runs and series of every configuration matching filters, one partition in memory at a time.
+
+        Yields:
+            tuple: The configuration (dict), its runs (DataFrame, see runs) and the series of every run,
+            as a list of int64 arrays in the same order.
+        """
+        for config, directory in self.partitions(**filters):
+            table = _read_runs(os.path.join(directory, "runs.csv"))
+            if table.empty:
+                continue
+            data = np.fromfile(os.path.join(directory, "fitness.i64"), dtype=np.int64)
+            series = [data[offset:offset + length] for offset, length in zip(table["offset"], table["length"])]
+            yield config, table, series
+
+    def keys(self, key):
+        """The key(...) of every stored run, e.g. to skip the runs already done when resuming a sweep."""
+        keys = set()
+        for config, directory in self.partitions():
+            for row in _read_runs(os.path.join(directory, "runs.csv")).to_dict("records"):
+                keys.add(key(dict(config, **row)))
+        return keys
+
+
+def _read_runs(path):
+    """Read a runs.csv, ignoring a last line cut short by a crash, or a missing file."""
+    lines = []
+    if os.path.exists(path):
+        with open(path, newline="") as f:
+            lines = f.read().splitlines(keepends=True)
+    rows = list(csv.reader(line for line in lines if line.endswith("\n")))
+    if not rows:
+        return pd.DataFrame({"offset": [], "length": []}, dtype=np.int64)
+    table = pd.DataFrame(rows[1:], columns=rows[0])
+    for column in table:
+        try:
+            table[column] = pd.to_numeric(table[column])
+        except ValueError:
+            pass
+    return table.astype({"offset": np.int64, "length": np.int64})
+
+
+def _repair(runs_path, series_path):
+    """Cut a partition back to its last complete run, after a crash in the middle of an append.
+
+    Returns:
+        int: Offset, in values, at which the series of the next run goes.
+    """
+    if os.path.exists(runs_path):
+        with open(runs_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+    table = _read_runs(runs_path)
+    end = int((table["offset"] + table["length"]).max()) if len(table) else 0
+    if os.path.exists(series_path) and os.path.getsize(series_path) > end * 8:
+        with open(series_path, "rb+") as f:
+            f.truncate(end * 8)
+    return end
@@ -0,0 +1,80 @@
+from array import array
+from random import shuffle, random
+from genome import GENOME_TYPECODE, match_table
+
+
+def shuffled_genome(teams):
+    """A random schedule: every fixture of the league once, in a uniformly random order."""
+    genome = array(GENOME_TYPECODE, range(len(match_table(tuple(teams))[0])))
+    shuffle(genome)
+    return genome
+
+
+def round_robin_genome(teams):
+    """A random double round-robin schedule built with the circle method.
+
+    Teams are shuffled onto the circle: one team stays fixed while the others
+    rotate every round, and home and away alternate so that no team plays
+    more than two consecutive away games. The second half of the season
+    repeats the first with home and away swapped, starting from its second
+    round so that no pair meets in two consecutive rounds. Every pair thus
+    meets exactly twice, once at home and once away, and every team plays at
+    most once per round.
+
+    Args:
+        teams (list): Team names of the league.
+
+    Returns:
+        array: The schedule as a genome, round after round.
+    """
+    index = match_table(tuple(teams))[1]
+    circle = list(teams)
+    shuffle(circle)
+    if len(circle) % 2:
+        circle.append(None)  # bye
+    n = len(circle)
+    fixed = n - 1
+
+    first_half = []
+    for round_number in range(fixed):
+        pairs = [(fixed, round_number) if round_number % 2 == 0 else (round_number, fixed)]
+        for k in range(1, n // 2):
+            team1, team2 = (round_number + k) % fixed, (round_number - k) % fixed
+            pairs.append((team1, team2) if k % 2 else (team2, team1))
+        first_half.append([(circle[home], circle[away]) for home, away in pairs])
+
+    second_half = [[(away, home) for home, away in games] for games in first_half[1:] + first_half[:1]]
+    swap = random() < 0.5
+
+    genome = array(GENOME_TYPECODE)
+    for games in first_half + second_half:
+        games = [(away, home) if swap else (home, away) for home, away in games if home is not None and away is not None]
+        shuffle(games)
+        genome.extend(index[game] for game in games)
+    return genome
+
+
+seeders = {"shuffle": shuffled_genome, "round_robin": round_robin_genome}
+
+
+def seed_genomes(teams, count, method="shuffle"):
+    """Build the genomes of a whole population in one call.
+
+    Args:
+        teams (list): Team names of the league.
+        count (int): Number of genomes.
+        method (str): "shuffle" for random orders of the fixtures (as in Data.valid_set_pt),
+            "round_robin" for valid double round-robin schedules.
+
+    Returns:
+        list: The genomes.
+    """
+    if method not in seeders:
+        raise ValueError(f"Unknown seeding method: {method}")
+    if method == "shuffle":
+        base = array(GENOME_TYPECODE, range(len(match_table(tuple(teams))[0])))
+        genomes = [base[:] for _ in range(count)]
+        for genome in genomes:
+            shuffle(genome)
+        return genomes
+    return [seeders[method](teams) for _ in range(count)]
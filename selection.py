@@ -1,5 +1,67 @@
 from operator import attrgetter
 from random import uniform, choice, sample, choices
+from itertools import accumulate
+
+
+def fps_table(population):
+    """Fitness proportionate selection table for a maximization problem.
+
+    Fitness values are shifted so that the worst individual gets a weight of 1
+    when the population has zero or negative fitness, as the schedules usually do.
+
+    Args:
+        population (Population): The population we want to select from.
+
+    Returns:
+        function: draw(k), returning k selected individuals.
+    """
+    individuals = list(population)
+    fitness = [ind.fitness for ind in individuals]
+    lowest = min(fitness)
+    shift = 1 - lowest if lowest <= 0 else 0
+
+    # Cumulative selection weights based on fitness proportion
+    cum_weights = list(accumulate(f + shift for f in fitness))
+
+    def draw(k):
+        return choices(individuals, cum_weights=cum_weights, k=k)
+    return draw
+
+
+def rank_table(population):
+    """Rank-based selection table for a maximization problem.
+
+    Args:
+        population (Population): The population we want to select from.
+
+    Returns:
+        function: draw(k), returning k selected individuals.
+    """
+    sorted_population = sorted(population, key=attrgetter('fitness'), reverse=True)
+
+    # Cumulative selection weights based on ranks
+    cum_weights = list(accumulate(range(1, len(sorted_population) + 1)))
+
+    def draw(k):
+        return choices(sorted_population, cum_weights=cum_weights, k=k)
+    return draw
+
+
+def tournament_table(population, tour_size=3):
+    """Tournament selection table for a maximization problem.
+
+    Args:
+        population (Population): The population we want to select from.
+        tour_size (int): Size of the tournament.
+
+    Returns:
+        function: draw(k), returning the winners of k tournaments.
+    """
+    individuals = list(population)
+
+    def draw(k):
+        return [max(sample(individuals, tour_size), key=attrgetter('fitness')) for _ in range(k)]
+    return draw
 
 
 def fps(population):
@@ -11,15 +73,7 @@ def fps(population):
     Returns:
         Individual: Selected individual.
     """
-    max_fitness = max(ind.fitness for ind in population)
-    total_fitness = sum(ind.fitness for ind in population)
-
-    # Calculate selection probabilities based on fitness proportion
-    selection_probabilities = [(ind.fitness / total_fitness) for ind in population]
-
-    # Choose an individual based on selection probabilities
-    selected_index = choices(range(len(population)), weights=selection_probabilities, k=1)[0]
-    return population[selected_index]
+    return fps_table(population)(1)[0]
 
 
 def rank_selection(population):
@@ -31,16 +85,7 @@ def rank_selection(population):
     Returns:
         Individual: Selected individual.
     """
-    sorted_population = sorted(population, key=attrgetter('fitness'), reverse=True)
-    ranks = [i + 1 for i in range(len(sorted_population))]
-    total_ranks = sum(ranks)
-
-    # Calculate selection probabilities based on ranks
-    selection_probabilities = [rank / total_ranks for rank in ranks]
-
-    # Choose an individual based on selection probabilities
-    selected_index = choices(range(len(sorted_population)), weights=selection_probabilities, k=1)[0]
-    return sorted_population[selected_index]
+    return rank_table(population)(1)[0]
 
 
 def tournament_sel(population, tour_size=3):
@@ -53,5 +98,29 @@ def tournament_sel(population, tour_size=3):
     Returns:
         Individual: Selected individual.
     """
-    tournament = sample(list(population), tour_size)
-    return max(tournament, key=attrgetter('fitness'))
\ No newline at end of file
+    return tournament_table(population, tour_size)(1)[0]
+
+
+tables = {fps: fps_table, rank_selection: rank_table, tournament_sel: tournament_table}
+
+
+def selection_table(select, population):
+    """Prepare a selection function for one generation.
+
+    The selection table (cumulative weights, ranks) is built once, after which
+    any number of parents can be drawn in one call. Selection functions
+    without a table are simply called once per parent.
+
+    Args:
+        select (function): Selection function, e.g. fps, rank_selection or tournament_sel.
+        population (Population): The population we want to select from.
+
+    Returns:
+        function: draw(k), returning k selected individuals.
+    """
+    if select in tables:
+        return tables[select](population)
+
+    def draw(k):
+        return [select(population) for _ in range(k)]
+    return draw
@@ -0,0 +1,93 @@
+from time import monotonic
+
+
+class StoppingCriterion:
+    """Ends Population.evolve before its last generation.
+
+    Criteria are passed as evolve(..., stop=[...]) and the run stops after
+    the first generation at which any of them is met. The reason is stored in
+    Population.stop_reason.
+    """
+
+    def start(self, population):
+        """Called when evolve starts, before the first generation."""
+
+    def check(self, population, gen, best_fitness, fitness_list):
+        """Whether to stop after a generation.
+
+        Args:
+            population (Population): The population, holding the new generation.
+            gen (int): Number of the generation, counted from 1.
+            best_fitness (int): Best fitness found so far.
+            fitness_list (list): Best fitness of every generation so far.
+
+        Returns:
+            str: Why the run stops, or None to go on.
+        """
+
+
+class TargetFitness(StoppingCriterion):
+    """Stops once an individual reaches a fitness."""
+
+    def __init__(self, target):
+        self.target = target
+
+    def check(self, population, gen, best_fitness, fitness_list):
+        if best_fitness >= self.target:
+            return f"target fitness {self.target} reached"
+
+
+class Stagnation(StoppingCriterion):
+    """Stops when the best fitness has not improved for some generations."""
+
+    def __init__(self, generations):
+        self.generations = generations
+
+    def start(self, population):
+        self._best = None
+        self._since = 0
+
+    def check(self, population, gen, best_fitness, fitness_list):
+        if self._best is None or best_fitness > self._best:
+            self._best = best_fitness
+            self._since = 0
+            return None
+        self._since += 1
+        if self._since >= self.generations:
+            return f"no improvement in {self.generations} generations"
+
+
+class MaxEvaluations(StoppingCriterion):
+    """Stops once the run has made a number of full fitness evaluations, see Population.evaluations."""
+
+    def __init__(self, evaluations):
+        self.evaluations = evaluations
+
+    def start(self, population):
+        self._start = population.evaluations
+
+    def check(self, population, gen, best_fitness, fitness_list):
+        if population.evaluations - self._start >= self.evaluations:
+            return f"{self.evaluations} fitness evaluations used"
+
+
+class Deadline(StoppingCriterion):
+    """Stops once a wall-clock budget is spent.
+
+    The budget is checked between generations, so a run can overrun it by up
+    to one generation.
+    """
+
+    def __init__(self, seconds):
+        """
+        Args:
+            seconds (float): Time budget of the run, counted from the start of evolve.
+        """
+        self.seconds = seconds
+
+    def start(self, population):
+        self._deadline = monotonic() + self.seconds
+
+    def check(self, population, gen, best_fitness, fitness_list):
+        if monotonic() >= self._deadline:
+            return f"time budget of {self.seconds}s spent"
@@ -0,0 +1,59 @@
+import random
+from operator import attrgetter
+from statistics import mean, pstdev
+
+import pytest
+
+import mutation
+import xo
+from Data import teams
+from charles import Individual, Population
+from elites import TopK
+from selection import tournament_sel
+
+
+def scored(fitness):
+    individuals = [Individual(teams=teams) for _ in fitness]
+    for individual, value in zip(individuals, fitness):
+        individual.fitness = value
+    return individuals
+
+
+@pytest.mark.parametrize("k", [1, 3, 5, 20])
+def test_top_matches_sorting(k):
+    random.seed(0)
+    # Few distinct values, so most individuals tie with others
+    individuals = scored([random.randint(-5, 0) for _ in range(40)])
+    top = TopK(k, individuals)
+    ranked = sorted(individuals, key=attrgetter("fitness"), reverse=True)
+    assert top.elites() == ranked[:k]
+    assert top.elites(2) == ranked[:min(k, 2)]
+    assert top.best is max(individuals, key=attrgetter("fitness"))
+    assert len(top) == min(k, len(individuals))
+
+
+def test_ties_keep_the_order_of_arrival():
+    first, second, third = scored([-1, -1, -1])
+    top = TopK(2, [first, second, third])
+    assert top.best is first
+    assert top.elites() == [first, second]
+
+
+def test_mean_and_std():
+    fitness = [-40, -12, -12, -3, 7, -120]
+    top = TopK(2, scored(fitness))
+    assert top.count == len(fitness)
+    assert top.mean == pytest.approx(mean(fitness))
+    assert top.std == pytest.approx(pstdev(fitness))
+
+
+def test_best_individual_after_evolve():
+    random.seed(3)
+    population = Population(size=20, teams=teams, elitism=3)
+    population.evolve(gens=5, xo_prob=0.9, mut_prob=0.3, select=tournament_sel, mutate=mutation.swap_mutation,
+                      crossover=xo.order_xo, observers=[])
+    assert population.best_individual() is population.top.best
+    assert population.best_individual() is max(population.individuals, key=attrgetter("fitness"))
+    # A population that no longer matches its top is scanned
+    population.individuals.pop(population.individuals.index(population.top.best))
+    assert population.best_individual() is max(population.individuals, key=attrgetter("fitness"))
@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+import pytest
+
+import mutation
+import vectorized
+import xo
+from Data import teams
+from charles import Individual, Population
+from fitness import genome_matrix
+from local_search import LocalSearch
+from selection import tournament_sel
+from stopping import StoppingCriterion
+
+OPERATORS = dict(xo_prob=0.9, mut_prob=0.3, select=tournament_sel, mutate=mutation.swap_mutation,
+                 crossover=xo.order_xo)
+
+
+def run(gens=10, seed=7, elitism=True, **kwargs):
+    """Evolve a small league from a seed, returning what evolve returns and the final genomes."""
+    random.seed(seed)
+    population = Population(size=15, teams=teams, elitism=elitism)
+    result = population.evolve(gens=gens, observers=[], **dict(OPERATORS, **kwargs))
+    return result, [individual.genome.tolist() for individual in population]
+
+
+class StopAt(StoppingCriterion):
+    """Interrupts a run after a given generation."""
+
+    def __init__(self, gen):
+        self.gen = gen
+
+    def check(self, population, gen, best_fitness, fitness_list):
+        return "interrupted" if gen == self.gen else None
+
+
+def test_workers_match_serial():
+    assert run(workers=2) == run()
+
+
+@pytest.mark.parametrize("batched", [False, True])
+@pytest.mark.parametrize("elitism", [True, 3])
+def test_pool_matches_no_pool(elitism, batched):
+    assert run(pool=True, elitism=elitism, batched=batched) == run(elitism=elitism, batched=batched)
+
+
+@pytest.mark.parametrize("options", [{}, {"elitism": False}, {"pool": True, "elitism": 3}, {"batched": True},
+                                     {"local_search": True}])
+def test_resume_matches_uninterrupted(tmp_path, options):
+    def kwargs():
+        # A fresh local search for every run, as it counts its moves
+        return dict(options, local_search=LocalSearch(2, 10)) if "local_search" in options else options
+
+    expected = run(gens=12, **kwargs())
+    checkpoint = str(tmp_path / "run.ckpt")
+    run(gens=12, stop=[StopAt(5)], checkpoint=checkpoint, **kwargs())
+    population = Population.load(checkpoint)
+    result = population.evolve(**dict(population.run_config, observers=[]))
+    assert (result, [individual.genome.tolist() for individual in population]) == expected
+
+
+@pytest.mark.parametrize("name", ["order_xo", "modified_order_xo", "position_based_xo"])
+def test_batched_crossover_matches_scalar(name, monkeypatch):
+    random.seed(0)
+    parents = [Individual(teams=teams) for _ in range(16)]
+    parents1, parents2 = genome_matrix(parents[:8]), genome_matrix(parents[8:])
+    mask = np.ones(8, dtype=bool)
+    offspring1, offspring2 = vectorized.batch_operators[getattr(xo, name)](parents1, parents2, mask,
+                                                                           np.random.default_rng(1))
+    start, end = vectorized._pair_points(np.random.default_rng(1), *parents1.shape)
+    for row in range(8):
+        monkeypatch.setattr(xo, "sample", lambda population, k: [int(start[row, 0]), int(end[row, 0])])
+        child1, child2 = getattr(xo, name)(parents[row], parents[8 + row])
+        assert child1.genome.tolist() == offspring1[row].tolist()
+        assert child2.genome.tolist() == offspring2[row].tolist()
+
+
+@pytest.mark.parametrize("name", ["swap_mutation", "inversion_mutation", "insertion_mutation"])
+def test_batched_mutation_matches_scalar(name, monkeypatch):
+    random.seed(0)
+    individuals = [Individual(teams=teams) for _ in range(8)]
+    mask = np.array([True, False] * 4)
+    mutated = vectorized.batch_operators[getattr(mutation, name)](genome_matrix(individuals), mask,
+                                                                  np.random.default_rng(1))
+    first, second = vectorized._pair_points(np.random.default_rng(1), len(individuals), len(individuals[0]))
+    for row, individual in enumerate(individuals):
+        if mask[row]:
+            monkeypatch.setattr(mutation, "sample", lambda population, k: [int(first[row, 0]), int(second[row, 0])])
+            getattr(mutation, name)(individual)
+        assert individual.genome.tolist() == mutated[row].tolist()
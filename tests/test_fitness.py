@@ -0,0 +1,188 @@
+import random
+
+import pytest
+
+from Data import pt_teams, teams, build_calendar
+from charles import Individual, Population
+from constraints import DEFAULT_CONSTRAINTS, Derby, StadiumSharing, AwayStreak, score
+from fitness import BatchFitness, genome_matrix, MIN_BATCH
+from mutation import swap_mutation, insertion_mutation, inversion_mutation, scramble_mutation, displacement_mutation
+from problem import ProblemInstance
+
+TEAMS_20 = pt_teams + [f"Team {i}" for i in range(11, 21)]
+
+# A league playing the classics of Data.CLASSICS, which pt_teams only partly does
+CLASSIC_TEAMS = ["Sporting", "Benfica", "Porto", "Braga", "Arouca", "Farense"]
+
+EXTRA_CONSTRAINTS = DEFAULT_CONSTRAINTS + (
+    Derby([("Porto", "Boavista"), ("Sporting", "Benfica")]),
+    StadiumSharing([("Porto", "Team 15")], weight=-7),
+    AwayStreak(max_streak=3, weight=-4),
+)
+
+
+def original_fitness(representation, teams, random_game_dates_pt):
+    """Individual.get_fitness as it was before the genome was encoded, on a list of [home, away] pairs."""
+    def create_game_date_mapping(random_game_dates_pt):
+        game_date_mapping = {}
+        for i, game in enumerate(representation):
+            game_date_mapping[str(game)] = random_game_dates_pt[i]
+        return game_date_mapping
+
+    game_date_mapping = create_game_date_mapping(random_game_dates_pt)
+    fitness = 0
+    matches = {team: [] for team in teams}
+
+    for game in representation:
+        matches[game[0]].append(game)
+        matches[game[1]].append(game)
+
+    pairs_count = {}
+    for game in representation:
+        pair = tuple(sorted(game))
+        if pair not in pairs_count:
+            pairs_count[pair] = 0
+        pairs_count[pair] += 1
+
+    for count in pairs_count.values():
+        if count != 2:
+            fitness -= 10
+
+    for team, games in matches.items():
+        away_streak = 0
+        for game in games:
+            if game[1] == team:
+                away_streak += 1
+                if away_streak > 2:
+                    fitness -= 10
+            else:
+                away_streak = 0
+
+    for team, games in matches.items():
+        game_dates = [game_date_mapping[str(game)] for game in games]
+        for i in range(len(game_dates) - 1):
+            if abs((game_dates[i + 1] - game_dates[i]).days) < 2:
+                fitness -= 10
+
+    classics = [['Sporting', 'Benfica'], ['Benfica', 'Sporting'], ['Sporting', 'Porto'], ['Porto', 'Sporting'],
+                ['Porto', 'Benfica'], ['Benfica', 'Porto'],]
+
+    for match in representation:
+        match_str = str(match)
+        if match in classics:
+            match_date = game_date_mapping[match_str]
+            if match_date.weekday() == 5:
+                fitness += 1
+            else:
+                fitness -= -1
+
+    saturdays_played = {team: 0 for team in teams}
+    sundays_played = {team: 0 for team in teams}
+
+    for match in representation:
+        match_str = str(match)
+        if match in classics:
+            match_date = game_date_mapping[match_str]
+            if match_date.weekday() == 5:
+                saturdays_played[match[0]] += 1
+                saturdays_played[match[1]] += 1
+            else:
+                sundays_played[match[0]] += 1
+                sundays_played[match[1]] += 1
+
+    saturday_sunday_difference = sum(abs(saturdays_played[team] - sundays_played[team]) for team in teams)
+    saturday_sunday_fitness_contribution = min(5, 5 - saturday_sunday_difference)
+    fitness += saturday_sunday_fitness_contribution
+
+    for i, match in enumerate(representation):
+        if match in classics:
+            match_date = game_date_mapping[str(match)]
+            for other_match in representation[i + 1:]:
+                if other_match in classics:
+                    other_match_date = game_date_mapping[str(other_match)]
+                    days_interval = (other_match_date - match_date).days
+                    if days_interval > 8:
+                        fitness += 2
+                    elif days_interval >= 7:
+                        fitness += 1
+                    break
+
+    return fitness
+
+
+def population(problem, size=30, repeated=10, seed=0):
+    """Random schedules, the first repeated of them with some matches repeated."""
+    random.seed(seed)
+    individuals = [Individual(problem=problem) for _ in range(size)]
+    for individual in individuals[:repeated]:
+        for _ in range(5):
+            individual.genome[random.randrange(problem.n_matches)] = random.randrange(problem.n_matches)
+    return individuals
+
+
+@pytest.fixture(scope="module")
+def league_20():
+    return build_calendar("2024-07-01", "2025-08-31", range(7), 20, TEAMS_20)
+
+
+@pytest.mark.parametrize("league", [teams, pt_teams, CLASSIC_TEAMS])
+def test_get_fitness_matches_original(league):
+    problem = ProblemInstance.get(league)
+    for individual in population(problem, size=100, repeated=30):
+        expected = original_fitness(individual.representation, list(league), problem.game_dates)
+        assert individual.get_fitness() == expected
+
+
+@pytest.mark.parametrize("extra", [False, True])
+@pytest.mark.parametrize("league", ["pt", "20"])
+def test_batch_matches_score(league, extra, league_20):
+    dates = None if league == "pt" else league_20
+    problem = ProblemInstance.get(pt_teams if league == "pt" else TEAMS_20, dates,
+                                  constraints=EXTRA_CONSTRAINTS if extra else None)
+    individuals = population(problem)
+    scores = [score(problem, individual.genome) for individual in individuals]
+    assert list(BatchFitness(problem)(genome_matrix(individuals))) == scores
+
+
+@pytest.mark.parametrize("size", [MIN_BATCH - 1, 50])
+def test_evaluate_matches_get_fitness(size):
+    problem = ProblemInstance.get(pt_teams)
+    individuals = population(problem, size=size)
+    Population(size=size, teams=pt_teams, individuals=individuals).evaluate(individuals)
+    assert [individual._fitness for individual in individuals] == [individual.get_fitness() for individual in individuals]
+
+
+@pytest.mark.parametrize("extra", [False, True])
+@pytest.mark.parametrize("league", ["pt", "20"])
+def test_delta_matches_score(league, extra, league_20):
+    dates = None if league == "pt" else league_20
+    problem = ProblemInstance.get(pt_teams if league == "pt" else TEAMS_20, dates,
+                                  constraints=EXTRA_CONSTRAINTS if extra else None)
+    random.seed(1)
+    for individual in population(problem):
+        for _ in range(20):
+            positions = random.sample(range(problem.n_matches), 2)
+            move = {positions[0]: individual[positions[1]], positions[1]: random.randrange(problem.n_matches)}
+            before, delta = individual.fitness, individual.move_delta(move)
+            individual.apply_move(move)
+            assert individual._state is not None
+            assert individual.fitness == score(problem, individual.genome) == before + delta
+
+
+@pytest.mark.parametrize("mutate", [swap_mutation, insertion_mutation, inversion_mutation, scramble_mutation,
+                                    displacement_mutation])
+def test_mutations_keep_the_fitness_right(mutate):
+    problem = ProblemInstance.get(pt_teams)
+    random.seed(2)
+    for individual in population(problem):
+        for _ in range(10):
+            # With and without an incremental state, see Individual.apply_move
+            if random.random() < 0.5:
+                individual.move_delta({})
+            mutate(individual)
+            assert individual.fitness == score(problem, individual.genome)
+
+
+def test_short_calendar_is_rejected():
+    with pytest.raises(ValueError):
+        ProblemInstance.get(TEAMS_20)
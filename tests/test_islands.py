@@ -0,0 +1,18 @@
+from Data import pt_teams, build_calendar
+from islands import run_islands
+from mutation import swap_mutation, inversion_mutation
+from problem import ProblemInstance
+from selection import tournament_sel, fps
+from xo import order_xo, pmx
+
+ISLANDS = [(tournament_sel, order_xo, swap_mutation), (fps, pmx, inversion_mutation)]
+
+
+def test_islands_on_a_league_with_its_own_calendar():
+    teams = pt_teams + [f"Team {i}" for i in range(11, 19)]
+    problem = ProblemInstance.get(teams, build_calendar("2024-07-01", "2025-08-31", range(7), 20, teams))
+    best_fitness, metrics = run_islands(ISLANDS, teams, gens=4, migration_interval=2, size=8, workers=2,
+                                        problem=problem)
+    assert [len(island["fitness_list"]) for island in metrics] == [4, 4]
+    assert best_fitness >= max(island["fitness_list"][-1] for island in metrics)
+    assert all(island["migrants_received"] == 2 for island in metrics)
@@ -0,0 +1,39 @@
+import random
+import tracemalloc
+
+import pytest
+
+import mutation
+import xo
+from Data import teams
+from charles import Population
+from profiling import EvolveStats
+from selection import tournament_sel
+
+
+def run(stats, gens=6):
+    random.seed(0)
+    population = Population(size=20, teams=teams, elitism=True)
+    return population.evolve(gens=gens, xo_prob=0.9, mut_prob=0.3, select=tournament_sel,
+                             mutate=mutation.swap_mutation, crossover=xo.order_xo, observers=[], stats=stats)[2]
+
+
+def test_peak_memory_of_every_generation():
+    stats = run(EvolveStats(memory=True))
+    assert len(stats.peak_memory) == 6 and all(peak > 0 for peak in stats.peak_memory)
+    assert stats.summary()["peak_memory"] == max(stats.peak_memory)
+    assert not tracemalloc.is_tracing()
+
+
+def test_no_memory_tracing_by_default():
+    assert run(EvolveStats()).peak_memory == []
+
+
+@pytest.mark.parametrize("profiler", ["cprofile", "tracemalloc"])
+@pytest.mark.parametrize("profile", [(2, 3), (4, 50)])
+def test_profile_is_dumped(tmp_path, profiler, profile):
+    dump = tmp_path / "evolve.prof"
+    stats = run(EvolveStats(profile=profile, profiler=profiler, dump=str(dump), memory=True))
+    assert dump.exists()
+    assert len(stats.peak_memory) == 6
+    assert not tracemalloc.is_tracing()
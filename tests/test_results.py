@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+from results import ResultsStore, SERIES
+
+
+def result(run, selection="fps", length=5):
+    return {"elitism": True, "selection_func": selection, "crossover_func": "pmx", "mutation_func": "swap_mutation",
+            "run": run, "best_fitness": -run, SERIES: list(range(run, run + length))}
+
+
+def key(row):
+    return row["selection_func"], row["run"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "runs"))
+    for run in range(3):
+        store.append(result(run))
+    store.append(result(0, selection="tournament_sel", length=3))
+    return store
+
+
+def paths(store):
+    directory = store.partition(result(0))
+    return os.path.join(directory, "runs.csv"), os.path.join(directory, "fitness.i64")
+
+
+def series(store, **filters):
+    return {config["selection_func"]: [values.tolist() for values in values_list]
+            for config, _, values_list in store.read(**filters)}
+
+
+def test_read_and_filter(store):
+    assert series(store) == {"fps": [[0, 1, 2, 3, 4], [1, 2, 3, 4, 5], [2, 3, 4, 5, 6]],
+                             "tournament_sel": [[0, 1, 2]]}
+    assert list(series(store, selection_func="tournament_sel")) == ["tournament_sel"]
+    assert store.runs(selection_func="fps")["best_fitness"].tolist() == [0, -1, -2]
+    assert store.keys(key) == {("fps", 0), ("fps", 1), ("fps", 2), ("tournament_sel", 0)}
+
+
+def test_torn_csv_line_is_dropped(store):
+    runs_path, series_path = paths(store)
+    # A crash while writing the row of run 3, after its series
+    with open(series_path, "ab") as f:
+        f.write(np.arange(5, dtype=np.int64).tobytes())
+    with open(runs_path, "a") as f:
+        f.write("3,-3,")
+    assert store.keys(key) == {("fps", 0), ("fps", 1), ("fps", 2), ("tournament_sel", 0)}
+    assert len(series(store)["fps"]) == 3
+
+    store.append(result(3))
+    assert series(store)["fps"][3] == [3, 4, 5, 6, 7]
+    assert os.path.getsize(series_path) == 4 * 5 * 8
+    assert ("fps", 3) in store.keys(key)
+
+
+def test_torn_series_is_cut(store):
+    runs_path, series_path = paths(store)
+    # A crash while writing the series of run 3, before its row
+    with open(series_path, "ab") as f:
+        f.write(np.arange(3, dtype=np.int64).tobytes()[:-4])
+    assert len(series(store)["fps"]) == 3
+
+    store.append(result(3, length=2))
+    assert series(store)["fps"] == [[0, 1, 2, 3, 4], [1, 2, 3, 4, 5], [2, 3, 4, 5, 6], [3, 4]]
+    assert os.path.getsize(series_path) == (3 * 5 + 2) * 8
+
+
+def test_crash_before_the_first_row(tmp_path):
+    store = ResultsStore(str(tmp_path / "runs"))
+    os.makedirs(store.partition(result(0)))
+    runs_path, series_path = paths(store)
+    with open(series_path, "wb") as f:
+        f.write(np.arange(4, dtype=np.int64).tobytes())
+    assert store.keys(key) == set() and series(store) == {}
+
+    store.append(result(0))
+    assert series(store) == {"fps": [[0, 1, 2, 3, 4]]}
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from genome import match_table
+from seeding import round_robin_genome, seed_genomes
+
+LEAGUES = [["Team %d" % i for i in range(n)] for n in (4, 5, 6, 7, 10, 20)]
+
+
+def rounds(genome, teams):
+    """The rounds of a circle-method schedule, as lists of (home, away) names."""
+    fixtures = match_table(tuple(teams))[0]
+    per_round = len(teams) // 2
+    return [[fixtures[game] for game in genome[i:i + per_round]] for i in range(0, len(genome), per_round)]
+
+
+@pytest.mark.parametrize("teams", LEAGUES, ids=len)
+def test_round_robin_invariants(teams):
+    random.seed(len(teams))
+    for _ in range(20):
+        genome = round_robin_genome(teams)
+        # Every fixture exactly once: every pair meets twice, once at home and once away
+        assert sorted(genome) == list(range(len(teams) * (len(teams) - 1)))
+
+        schedule = rounds(genome, teams)
+        assert len(schedule) == 2 * (len(teams) - 1 + len(teams) % 2)
+        for games in schedule:
+            playing = [team for game in games for team in game]
+            assert len(playing) == len(set(playing))
+        for games, next_games in zip(schedule, schedule[1:]):
+            assert not {frozenset(game) for game in games} & {frozenset(game) for game in next_games}
+
+        for team in teams:
+            away_streak = 0
+            for games in schedule:
+                for home, away in games:
+                    if team == away:
+                        away_streak += 1
+                        assert away_streak <= 2
+                    elif team == home:
+                        away_streak = 0
+
+
+def test_seed_genomes():
+    random.seed(0)
+    teams = LEAGUES[2]
+    for method in ("shuffle", "round_robin"):
+        genomes = seed_genomes(teams, 5, method)
+        assert len(genomes) == 5
+        assert all(sorted(genome) == list(range(30)) for genome in genomes)
+    with pytest.raises(ValueError):
+        seed_genomes(teams, 5, "greedy")
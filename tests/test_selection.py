@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import selection
+from Data import teams
+from charles import Individual
+from selection import fps, fps_table, rank_selection, tournament_sel, selection_table
+
+
+def scored(*fitness):
+    individuals = [Individual(teams=teams) for _ in fitness]
+    for individual, value in zip(individuals, fitness):
+        individual.fitness = value
+    return individuals
+
+
+def weights(population, monkeypatch):
+    """Selection weights of the fps table of a population."""
+    drawn = {}
+
+    def choices(population, cum_weights, k):
+        drawn["weights"] = [b - a for a, b in zip([0] + cum_weights, cum_weights)]
+        return population[:k]
+    monkeypatch.setattr(selection, "choices", choices)
+    fps_table(population)(1)
+    return drawn["weights"]
+
+
+@pytest.mark.parametrize("fitness, expected", [
+    ((-30, -10, -20), [1, 21, 11]),
+    ((-5, 0, 5), [1, 6, 11]),
+    ((0, 0), [1, 1]),
+    ((3, 1, 2), [3, 1, 2]),
+])
+def test_fps_shifts_non_positive_fitness(fitness, expected, monkeypatch):
+    assert weights(scored(*fitness), monkeypatch) == expected
+
+
+def test_fps_draws_the_fittest_most():
+    random.seed(0)
+    population = scored(-100, -10, -1)
+    drawn = fps_table(population)(3000)
+    counts = [sum(individual is member for individual in drawn) for member in population]
+    assert counts[0] < counts[1] < counts[2]
+
+
+@pytest.mark.parametrize("select", [fps, rank_selection, tournament_sel])
+def test_selection_table_draws_members(select):
+    random.seed(0)
+    population = scored(-30, -10, -20, -5)
+    drawn = selection_table(select, population)(10)
+    assert len(drawn) == 10 and all(any(individual is member for member in population) for individual in drawn)
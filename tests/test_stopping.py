@@ -0,0 +1,67 @@
+import random
+
+import mutation
+import stopping
+import xo
+from Data import teams
+from charles import Population
+from selection import tournament_sel
+from stopping import TargetFitness, Stagnation, MaxEvaluations, Deadline
+
+
+class Evaluations:
+    """Stands in for a population, with its evaluation counter."""
+
+    def __init__(self, evaluations=0):
+        self.evaluations = evaluations
+
+
+def test_target_fitness():
+    criterion = TargetFitness(-10)
+    criterion.start(None)
+    assert criterion.check(None, 1, -11, [-11]) is None
+    assert criterion.check(None, 2, -10, [-11, -10]) == "target fitness -10 reached"
+
+
+def test_stagnation_counts_generations_without_improvement():
+    criterion = Stagnation(3)
+    criterion.start(None)
+    reasons = [criterion.check(None, gen, best, []) for gen, best in enumerate([-9, -9, -9, -5, -5, -5, -5], 1)]
+    assert reasons[:6] == [None] * 6
+    assert reasons[6] == "no improvement in 3 generations"
+
+    # Restarted by every run
+    criterion.start(None)
+    assert criterion.check(None, 1, -5, []) is None
+
+
+def test_max_evaluations_counts_from_the_start_of_the_run():
+    population = Evaluations(100)
+    criterion = MaxEvaluations(50)
+    criterion.start(population)
+    population.evaluations = 149
+    assert criterion.check(population, 1, 0, []) is None
+    population.evaluations = 150
+    assert criterion.check(population, 2, 0, []) == "50 fitness evaluations used"
+
+
+def test_deadline(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stopping, "monotonic", lambda: now[0])
+    criterion = Deadline(30)
+    criterion.start(None)
+    now[0] = 1029.9
+    assert criterion.check(None, 1, 0, []) is None
+    now[0] = 1030
+    assert criterion.check(None, 2, 0, []) == "time budget of 30s spent"
+
+
+def test_evolve_stops_after_the_generation_meeting_a_criterion():
+    random.seed(0)
+    population = Population(size=10, teams=teams, elitism=True)
+    best_fitness, fitness_list = population.evolve(
+        gens=50, xo_prob=0.9, mut_prob=0.3, select=tournament_sel, mutate=mutation.swap_mutation,
+        crossover=xo.order_xo, observers=[], stop=[Stagnation(1000), MaxEvaluations(35)])
+    assert len(fitness_list) < 50
+    assert population.stop_reason == f"35 fitness evaluations used after {len(fitness_list)} generations"
+    assert best_fitness == max(fitness_list)
@@ -0,0 +1,192 @@
+from array import array
+from random import getrandbits
+import numpy as np
+import xo
+import mutation
+from genome import GENOME_TYPECODE
+
+
+def generator():
+    """A NumPy random generator seeded from the random module, so that random.seed fixes batched runs too."""
+    return np.random.default_rng(getrandbits(64))
+
+
+def genome_row(row):
+    """Convert a row of an offspring matrix into a genome."""
+    return array(GENOME_TYPECODE, row.astype(np.uint16).tobytes())
+
+
+def _pair_points(rng, n, length):
+    """Draw two distinct positions per row, sorted, as sample(range(length), 2) followed by a sort."""
+    first = rng.integers(0, length, n)
+    second = rng.integers(0, length - 1, n)
+    second += second >= first
+    return np.minimum(first, second)[:, None], np.maximum(first, second)[:, None]
+
+
+def _select_rows(genomes, mask, changed):
+    """Keep the rows of changed where mask is set and those of genomes elsewhere."""
+    return np.where(np.asarray(mask, dtype=bool)[:, None], changed, genomes)
+
+
+def swap_mutation(genomes, mask, rng):
+    """Batched swap mutation: swap two distinct positions of every masked row.
+
+    Args:
+        genomes (numpy.ndarray): (N, n_games) matrix of match IDs.
+        mask (numpy.ndarray): Which rows to mutate.
+        rng (numpy.random.Generator): Random generator, see generator.
+
+    Returns:
+        numpy.ndarray: The mutated matrix; rows outside the mask are unchanged.
+    """
+    n, length = genomes.shape
+    first, second = _pair_points(rng, n, length)
+    positions = np.broadcast_to(np.arange(length), genomes.shape)
+    source = np.where(positions == first, second, np.where(positions == second, first, positions))
+    return _select_rows(genomes, mask, np.take_along_axis(genomes, source, axis=1))
+
+
+def inversion_mutation(genomes, mask, rng):
+    """Batched inversion mutation: reverse the segment [start, end) of every masked row.
+
+    Args and Returns as swap_mutation.
+    """
+    n, length = genomes.shape
+    start, end = _pair_points(rng, n, length)
+    positions = np.broadcast_to(np.arange(length), genomes.shape)
+    inside = (positions >= start) & (positions < end)
+    source = np.where(inside, start + end - 1 - positions, positions)
+    return _select_rows(genomes, mask, np.take_along_axis(genomes, source, axis=1))
+
+
+def scramble_mutation(genomes, mask, rng):
+    """Batched scramble mutation: shuffle the segment [start, end) of every masked row.
+
+    Args and Returns as swap_mutation.
+    """
+    n, length = genomes.shape
+    start, end = _pair_points(rng, n, length)
+    positions = np.broadcast_to(np.arange(length), genomes.shape)
+    inside = (positions >= start) & (positions < end)
+    # Positions inside the segment get random keys between start and start + 1, so they stay in place as a block
+    source = np.argsort(np.where(inside, start + rng.random(genomes.shape), positions), axis=1)
+    return _select_rows(genomes, mask, np.take_along_axis(genomes, source, axis=1))
+
+
+def insertion_mutation(genomes, mask, rng):
+    """Batched insertion mutation: move the gene at end to start, shifting the genes in between, in every masked row.
+
+    Args and Returns as swap_mutation.
+    """
+    n, length = genomes.shape
+    start, end = _pair_points(rng, n, length)
+    positions = np.broadcast_to(np.arange(length), genomes.shape)
+    source = np.where(positions == start, end, np.where((positions > start) & (positions <= end), positions - 1, positions))
+    return _select_rows(genomes, mask, np.take_along_axis(genomes, source, axis=1))
+
+
+def _fill(segment_parent, fill_parent, start, end, targets):
+    """Copy a segment of one parent and fill the other positions with the genes of another parent.
+
+    The genes of fill_parent are taken from position end onwards, wrapping
+    around, skipping the genes of the segment, and written in the order of
+    targets. Genomes are assumed to be permutations of their match IDs, as
+    seeded by seeding.seed_genomes.
+
+    Args:
+        segment_parent (numpy.ndarray): (N, n_games) parents giving the segment [start, end).
+        fill_parent (numpy.ndarray): (N, n_games) parents giving the other genes.
+        start (numpy.ndarray): (N, 1) first position of every segment.
+        end (numpy.ndarray): (N, 1) position right after every segment.
+        targets (numpy.ndarray): (N, n_games) positions to fill, in order; only the first n_games - segment
+            length of every row are used.
+
+    Returns:
+        numpy.ndarray: The offspring.
+    """
+    n, length = segment_parent.shape
+    rows = np.arange(n)[:, None]
+    positions = np.broadcast_to(np.arange(length), segment_parent.shape)
+    inside = (positions >= start) & (positions < end)
+
+    in_segment = np.zeros((n, int(max(segment_parent.max(), fill_parent.max())) + 1), dtype=bool)
+    in_segment[np.broadcast_to(rows, segment_parent.shape)[inside], segment_parent[inside]] = True
+    rotated = np.take_along_axis(fill_parent, (end + positions) % length, axis=1)
+    keep = ~in_segment[rows, rotated]
+    rank = np.cumsum(keep, axis=1) - 1
+    keep &= rank < length - (end - start)
+
+    offspring = np.where(inside, segment_parent, 0)
+    target = np.take_along_axis(targets, np.minimum(rank, length - 1), axis=1)
+    offspring[np.broadcast_to(rows, segment_parent.shape)[keep], target[keep]] = rotated[keep]
+    return offspring
+
+
+def _order_fill(parents1, parents2, start, end):
+    # The positions after the segment, wrapping around, as in xo.order_fill
+    targets = (end + np.arange(parents1.shape[1])) % parents1.shape[1]
+    return _fill(parents1, parents2, start, end, targets), _fill(parents2, parents1, start, end, targets)
+
+
+def order_xo(parents1, parents2, mask, rng):
+    """Batched order crossover, see xo.order_xo.
+
+    Every offspring keeps the segment [start, end) of its parent and takes
+    the other genes in the order of the other parent, from end onwards.
+
+    Args:
+        parents1 (numpy.ndarray): (N, n_games) first parents.
+        parents2 (numpy.ndarray): (N, n_games) second parents.
+        mask (numpy.ndarray): Which pairs to cross.
+        rng (numpy.random.Generator): Random generator, see generator.
+
+    Returns:
+        tuple: The two offspring matrices; pairs outside the mask are copies of their parents.
+    """
+    start, end = _pair_points(rng, *parents1.shape)
+    offspring1, offspring2 = _order_fill(parents1, parents2, start, end)
+    return _select_rows(parents1, mask, offspring1), _select_rows(parents2, mask, offspring2)
+
+
+def subtour_xo(parents1, parents2, mask, rng):
+    """Batched subtour crossover, see xo.subtour_xo: order crossover with a segment that may be empty.
+
+    Args and Returns as order_xo.
+    """
+    n, length = parents1.shape
+    points = np.sort(rng.integers(0, length, (n, 2)), axis=1)
+    offspring1, offspring2 = _order_fill(parents1, parents2, points[:, :1], points[:, 1:])
+    return _select_rows(parents1, mask, offspring1), _select_rows(parents2, mask, offspring2)
+
+
+def position_based_xo(parents1, parents2, mask, rng):
+    """Batched position-based crossover, see xo.position_based_xo.
+
+    Every offspring takes the segment [start, end) of the other parent and
+    fills the positions outside it, from the first one, with the genes of
+    its own parent from end onwards.
+
+    Args and Returns as order_xo.
+    """
+    n, length = parents1.shape
+    start, end = _pair_points(rng, n, length)
+    positions = np.broadcast_to(np.arange(length), parents1.shape)
+    # Positions outside the segment first, in increasing order
+    targets = np.argsort((positions >= start) & (positions < end), axis=1, kind="stable")
+    offspring1 = _fill(parents2, parents1, start, end, targets)
+    offspring2 = _fill(parents1, parents2, start, end, targets)
+    return _select_rows(parents1, mask, offspring1), _select_rows(parents2, mask, offspring2)
+
+
+# Batched version of every scalar operator that has one, see Population.evolve(..., batched=True)
+batch_operators = {
+    mutation.swap_mutation: swap_mutation,
+    mutation.inversion_mutation: inversion_mutation,
+    mutation.scramble_mutation: scramble_mutation,
+    mutation.insertion_mutation: insertion_mutation,
+    xo.order_xo: order_xo,
+    xo.modified_order_xo: order_xo,
+    xo.subtour_xo: subtour_xo,
+    xo.position_based_xo: position_based_xo,
+}
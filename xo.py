@@ -1,146 +1,222 @@
 from random import randint, sample, uniform, random, choice
 from charles import Individual
-from copy import copy
 
-def single_point_xo(parent1, parent2):
+
+def position_map(genome, size):
+    """Map every gene of a genome to its position.
+
+    Repeated genes map to their first position, as list.index would give.
+
+    Args:
+        genome (array): Genome to index.
+        size (int): Number of distinct match IDs.
+
+    Returns:
+        list: Position of every match ID, -1 for those missing from the genome.
+    """
+    positions = [-1] * size
+    for position in range(len(genome) - 1, -1, -1):
+        positions[genome[position]] = position
+    return positions
+
+
+def gene_counts(genes, size):
+    """Count the occurrences of every match ID among some genes, skipping empty (None) positions."""
+    counts = [0] * size
+    for gene in genes:
+        if gene is not None:
+            counts[gene] += 1
+    return counts
+
+
+def order_fill(offspring, parent, end, counts):
+    """Fill an offspring with the genes of a parent it does not contain yet, starting after a segment.
+
+    Genes are taken in the parent's order and written from position end
+    onwards, wrapping around, as in order crossover.
+
+    Args:
+        offspring (list): Offspring holding the copied segment, None elsewhere.
+        parent (Individual): Parent providing the remaining genes.
+        end (int): Position right after the copied segment.
+        counts (list): Occurrences of every match ID in the offspring, see gene_counts.
+    """
+    size = len(offspring)
+    pos = end
+    for i in range(size):
+        gene = parent.genome[(end + i) % size]
+        if not counts[gene]:
+            old = offspring[pos % size]
+            if old is not None:
+                counts[old] -= 1
+            offspring[pos % size] = gene
+            counts[gene] += 1
+            pos += 1
+
+
+def make_offspring(genes, parent, out, index):
+    """Wrap the genes of an offspring in a new Individual, or write them into out[index] in place.
+
+    Args:
+        genes: Match IDs of the offspring.
+        parent (Individual): A parent, giving the problem.
+        out (tuple): Individuals to write the offspring into, None to create one.
+        index (int): Which of out to write into.
+
+    Returns:
+        Individual: The offspring.
+    """
+    if out is None:
+        return Individual(problem=parent.problem, representation=genes)
+    out[index].overwrite(genes)
+    return out[index]
+
+
+def single_point_xo(parent1, parent2, out=None):
     """Implementation of single point crossover.
 
     Args:
         parent1 (Individual): First parent for crossover.
         parent2 (Individual): Second parent for crossover.
+        out (tuple): Two individuals to write the offspring into, see pool.GenomePool.
 
 
 
     Returns:
         Individuals: Two offspring, resulting from the crossover.
     """
-    xo_point = randint(1, len(parent1.representation) - 1)
+    xo_point = randint(1, len(parent1.genome) - 1)
 
-    offspring1_repr = parent1.representation[:xo_point] + parent2.representation[xo_point:]
-    offspring2_repr = parent2.representation[:xo_point] + parent1.representation[xo_point:]
+    offspring1_repr = parent1.genome[:xo_point] + parent2.genome[xo_point:]
+    offspring2_repr = parent2.genome[:xo_point] + parent1.genome[xo_point:]
 
-    offspring1 = Individual(teams=parent1.teams, representation=offspring1_repr)
-    offspring2 = Individual(teams=parent2.teams, representation=offspring2_repr)
+    offspring1 = make_offspring(offspring1_repr, parent1, out, 0)
+    offspring2 = make_offspring(offspring2_repr, parent1, out, 1)
 
     return offspring1, offspring2
 
-def cycle_xo(parent1, parent2):
+def cycle_xo(parent1, parent2, out=None):
     """Implementation of cycle crossover.
 
     Args:
         parent1 (Individual): First parent for crossover.
         parent2 (Individual): Second parent for crossover.
+        out (tuple): Two individuals to write the offspring into, see pool.GenomePool.
 
     Returns:
         tuple: Two offspring, resulting from the crossover.
     """
-    size = len(parent1.representation)
+    size = len(parent1.genome)
     offspring1 = [None] * size
     offspring2 = [None] * size
+    positions = position_map(parent1.genome, parent1.size)
 
-    while None in offspring1:
-        index = offspring1.index(None)
-        val1 = parent1.representation[index]
-        val2 = parent2.representation[index]
+    # the cycle starts at the first position, the rest is copied afterwards
+    index = 0
+    val1 = parent1.genome[index]
+    val2 = parent2.genome[index]
 
-        # copy the cycle elements
-        while val1 != val2:
-            offspring1[index] = parent1.representation[index]
-            offspring2[index] = parent2.representation[index]
-            val2 = parent2.representation[index]
-            index = parent1.representation.index(val2)
+    # copy the cycle elements
+    while val1 != val2:
+        offspring1[index] = parent1.genome[index]
+        offspring2[index] = parent2.genome[index]
+        val2 = parent2.genome[index]
+        index = positions[val2]
 
-        # copy the rest
-        for i in range(size):
-            if offspring1[i] is None:
-                offspring1[i] = parent2.representation[i]
-                offspring2[i] = parent1.representation[i]
+    # copy the rest
+    for i in range(size):
+        if offspring1[i] is None:
+            offspring1[i] = parent2.genome[i]
+            offspring2[i] = parent1.genome[i]
 
-    return Individual(representation=offspring1, teams=parent1.teams), Individual(representation=offspring2, teams=parent1.teams)
+    return make_offspring(offspring1, parent1, out, 0), make_offspring(offspring2, parent1, out, 1)
 
 
-def pmx(parent1, parent2):
+def pmx(parent1, parent2, out=None):
     """Implementation of partially matched/mapped crossover.
 
     Args:
         parent1 (Individual): First parent for crossover.
         parent2 (Individual): Second parent for crossover.
+        out (tuple): Two individuals to write the offspring into, see pool.GenomePool.
 
     Returns:
         tuple: Two offspring, resulting from the crossover.
     """
-    size = len(parent1.representation)
+    size = len(parent1.genome)
     xo_points = sample(range(size), 2)
     xo_points.sort()
 
     def pmx_offspring(x, y):
         o = [None] * size
-        o[xo_points[0]:xo_points[1]] = x.representation[xo_points[0]:xo_points[1]]
-        z = set(y.representation[xo_points[0]:xo_points[1]]) - set(x.representation[xo_points[0]:xo_points[1]])
+        o[xo_points[0]:xo_points[1]] = x.genome[xo_points[0]:xo_points[1]]
+        z = set(y.genome[xo_points[0]:xo_points[1]]) - set(x.genome[xo_points[0]:xo_points[1]])
+        positions = position_map(y.genome, y.size)
 
         # numbers that exist in the segment
         for i in z:
             temp = i
-            index = y.representation.index(x.representation[y.representation.index(temp)])
+            index = positions[x.genome[positions[temp]]]
             while o[index] is not None:
                 temp = index
-                index = y.representation.index(x.representation[temp])
+                index = positions[x.genome[temp]]
             o[index] = i
 
         # numbers that don't exist in the segment
-        while None in o:
-            index = o.index(None)
-            o[index] = y.representation[index]
+        for index in range(size):
+            if o[index] is None:
+                o[index] = y.genome[index]
         return o
 
     o1_rep, o2_rep = pmx_offspring(parent1, parent2), pmx_offspring(parent2, parent1)
-    return Individual(representation=o1_rep, teams=parent1.teams), Individual(representation=o2_rep, teams=parent1.teams)
+    return make_offspring(o1_rep, parent1, out, 0), make_offspring(o2_rep, parent1, out, 1)
 
-def geo_xo(parent1, parent2):
-    size = len(parent1.representation)
+def geo_xo(parent1, parent2, out=None):
+    size = len(parent1.genome)
     o1_rep = [None] * size
     o2_rep = [None] * size
     for i in range(size):
         r = random()
-        if i < len(parent1.representation) and i < len(parent2.representation):
-            o1_rep[i] = parent1.representation[i] if r < 0.5 else parent2.representation[i]
-            o2_rep[i] = parent2.representation[i] if r < 0.5 else parent1.representation[i]
-        elif i < len(parent1.representation):
-            o1_rep[i] = parent1.representation[i]
-            o2_rep[i] = parent1.representation[i]
-        elif i < len(parent2.representation):
-            o1_rep[i] = parent2.representation[i]
-            o2_rep[i] = parent2.representation[i]
-    offspring1 = Individual(teams=parent1.teams, representation=o1_rep)
-    offspring2 = Individual(teams=parent2.teams, representation=o2_rep)
+        if i < len(parent1.genome) and i < len(parent2.genome):
+            o1_rep[i] = parent1.genome[i] if r < 0.5 else parent2.genome[i]
+            o2_rep[i] = parent2.genome[i] if r < 0.5 else parent1.genome[i]
+        elif i < len(parent1.genome):
+            o1_rep[i] = parent1.genome[i]
+            o2_rep[i] = parent1.genome[i]
+        elif i < len(parent2.genome):
+            o1_rep[i] = parent2.genome[i]
+            o2_rep[i] = parent2.genome[i]
+    offspring1 = make_offspring(o1_rep, parent1, out, 0)
+    offspring2 = make_offspring(o2_rep, parent1, out, 1)
     return offspring1, offspring2
 
 
-def uniform_xo(parent1, parent2):
+def uniform_xo(parent1, parent2, out=None):
     """Uniform crossover implementation.
 
     Args:
         parent1 (Individual): First parent for crossover.
         parent2 (Individual): Second parent for crossover.
+        out (tuple): Two individuals to write the offspring into, see pool.GenomePool.
 
     Returns:
         tuple: Two offspring, resulting from the crossover.
     """
     offspring1_repr = []
     offspring2_repr = []
-    for gene1, gene2 in zip(parent1.representation, parent2.representation):
+    for gene1, gene2 in zip(parent1.genome, parent2.genome):
         if choice([True, False]):
             offspring1_repr.append(gene1)
             offspring2_repr.append(gene2)
         else:
             offspring1_repr.append(gene2)
             offspring2_repr.append(gene1)
-    offspring1 = Individual(teams=parent1.teams, representation=offspring1_repr)
-    offspring2 = Individual(teams=parent2.teams, representation=offspring2_repr)
+    offspring1 = make_offspring(offspring1_repr, parent1, out, 0)
+    offspring2 = make_offspring(offspring2_repr, parent1, out, 1)
     return offspring1, offspring2
 
 
-def two_point_xo(parent1, parent2):
+def two_point_xo(parent1, parent2, out=None):
     # Select two random crossover points
     point1 = randint(0, len(parent1) - 1)
     point2 = randint(0, len(parent1) - 1)
@@ -149,82 +225,78 @@ def two_point_xo(parent1, parent2):
     if point1 > point2:
         point1, point2 = point2, point1
 
-    # Perform crossover
-    offspring1 = copy(parent1)
-    offspring2 = copy(parent2)
-    offspring1[point1:point2], offspring2[point1:point2] = offspring2[point1:point2], offspring1[point1:point2]
+    # Perform crossover on fresh genomes so that the parents are left untouched
+    offspring1_repr = parent1.genome[:point1] + parent2.genome[point1:point2] + parent1.genome[point2:]
+    offspring2_repr = parent2.genome[:point1] + parent1.genome[point1:point2] + parent2.genome[point2:]
 
+    offspring1 = make_offspring(offspring1_repr, parent1, out, 0)
+    offspring2 = make_offspring(offspring2_repr, parent1, out, 1)
     return offspring1, offspring2
 
 
-def position_based_xo(parent1, parent2):
+def position_based_xo(parent1, parent2, out=None):
     """Implementation of Position-based Crossover (POS).
 
     Args:
         parent1 (Individual): First parent for crossover.
         parent2 (Individual): Second parent for crossover.
+        out (tuple): Two individuals to write the offspring into, see pool.GenomePool.
 
     Returns:
         tuple: Two offspring resulting from the crossover.
     """
-    size = len(parent1.representation)
+    size = len(parent1.genome)
     point1, point2 = sorted(sample(range(size), 2))
 
     offspring1_repr = [None] * size
     offspring2_repr = [None] * size
 
     # Swap genes between parents at the selected points
-    offspring1_repr[point1:point2] = parent2.representation[point1:point2]
-    offspring2_repr[point1:point2] = parent1.representation[point1:point2]
+    offspring1_repr[point1:point2] = parent2.genome[point1:point2]
+    offspring2_repr[point1:point2] = parent1.genome[point1:point2]
 
     # Fill in the remaining positions with genes from the other parent
     # Ensure that each gene appears only once in each offspring
+    in_segment1 = gene_counts(offspring1_repr[point1:point2], parent1.size)
+    in_segment2 = gene_counts(offspring2_repr[point1:point2], parent1.size)
     idx1 = idx2 = point2
     for i in range(size):
         if offspring1_repr[i] is None:
-            while parent1.representation[idx1] in offspring1_repr[point1:point2]:
+            while in_segment1[parent1.genome[idx1]]:
                 idx1 = (idx1 + 1) % size
-            offspring1_repr[i] = parent1.representation[idx1]
+            offspring1_repr[i] = parent1.genome[idx1]
             idx1 = (idx1 + 1) % size
         if offspring2_repr[i] is None:
-            while parent2.representation[idx2] in offspring2_repr[point1:point2]:
+            while in_segment2[parent2.genome[idx2]]:
                 idx2 = (idx2 + 1) % size
-            offspring2_repr[i] = parent2.representation[idx2]
+            offspring2_repr[i] = parent2.genome[idx2]
             idx2 = (idx2 + 1) % size
 
-    offspring1 = Individual(teams=parent1.teams, representation=offspring1_repr)
-    offspring2 = Individual(teams=parent2.teams, representation=offspring2_repr)
+    offspring1 = make_offspring(offspring1_repr, parent1, out, 0)
+    offspring2 = make_offspring(offspring2_repr, parent1, out, 1)
     return offspring1, offspring2
 
-def order_xo(parent1, parent2): # bad fitness
-    size = len(parent1.representation)
+def order_xo(parent1, parent2, out=None): # bad fitness
+    size = len(parent1.genome)
     point1, point2 = sorted(sample(range(size), 2))
 
     offspring1_repr = [None] * size
     offspring2_repr = [None] * size
 
-    offspring1_repr[point1:point2] = parent1.representation[point1:point2]
-    offspring2_repr[point1:point2] = parent2.representation[point1:point2]
+    offspring1_repr[point1:point2] = parent1.genome[point1:point2]
+    offspring2_repr[point1:point2] = parent2.genome[point1:point2]
 
-    def fill_offspring(offspring, parent):
-        pos = point2
-        for i in range(size):
-            gene = parent.representation[(point2 + i) % size]
-            if gene not in offspring:
-                offspring[pos % size] = gene
-                pos += 1
+    order_fill(offspring1_repr, parent2, point2, gene_counts(offspring1_repr, parent1.size))
+    order_fill(offspring2_repr, parent1, point2, gene_counts(offspring2_repr, parent1.size))
 
-    fill_offspring(offspring1_repr, parent2)
-    fill_offspring(offspring2_repr, parent1)
-
-    offspring1 = Individual(teams=parent1.teams, representation=offspring1_repr)
-    offspring2 = Individual(teams=parent2.teams, representation=offspring2_repr)
+    offspring1 = make_offspring(offspring1_repr, parent1, out, 0)
+    offspring2 = make_offspring(offspring2_repr, parent1, out, 1)
     return offspring1, offspring2
 
 
 
-def subtour_xo(parent1, parent2):   # good fitness chega ao 7
-    size = len(parent1.representation)
+def subtour_xo(parent1, parent2, out=None):   # good fitness chega ao 7
+    size = len(parent1.genome)
     offspring1_repr = [None] * size
     offspring2_repr = [None] * size
 
@@ -233,48 +305,32 @@ def subtour_xo(parent1, parent2):   # good fitness chega ao 7
     if start > end:
         start, end = end, start
 
-    offspring1_repr[start:end] = parent1.representation[start:end]
-    offspring2_repr[start:end] = parent2.representation[start:end]
-
-    def fill_offspring(offspring, parent, start, end):
-        pos = end
-        for i in range(size):
-            gene = parent.representation[(end + i) % size]
-            if gene not in offspring:
-                offspring[pos % size] = gene
-                pos += 1
+    offspring1_repr[start:end] = parent1.genome[start:end]
+    offspring2_repr[start:end] = parent2.genome[start:end]
 
-    fill_offspring(offspring1_repr, parent2, start, end)
-    fill_offspring(offspring2_repr, parent1, start, end)
+    order_fill(offspring1_repr, parent2, end, gene_counts(offspring1_repr, parent1.size))
+    order_fill(offspring2_repr, parent1, end, gene_counts(offspring2_repr, parent1.size))
 
-    offspring1 = Individual(teams=parent1.teams, representation=offspring1_repr)
-    offspring2 = Individual(teams=parent2.teams, representation=offspring2_repr)
+    offspring1 = make_offspring(offspring1_repr, parent1, out, 0)
+    offspring2 = make_offspring(offspring2_repr, parent1, out, 1)
     return offspring1, offspring2
 
 
-def modified_order_xo(parent1, parent2): # not great fitness
-    size = len(parent1.representation)
+def modified_order_xo(parent1, parent2, out=None): # not great fitness
+    size = len(parent1.genome)
     point1, point2 = sorted(sample(range(size), 2))
 
     offspring1_repr = [None] * size
     offspring2_repr = [None] * size
 
-    offspring1_repr[point1:point2] = parent1.representation[point1:point2]
-    offspring2_repr[point1:point2] = parent2.representation[point1:point2]
-
-    def fill_offspring(offspring, parent, start, end):
-        pos = end
-        for i in range(size):
-            gene = parent.representation[(end + i) % size]
-            if gene not in offspring:
-                offspring[pos % size] = gene
-                pos += 1
+    offspring1_repr[point1:point2] = parent1.genome[point1:point2]
+    offspring2_repr[point1:point2] = parent2.genome[point1:point2]
 
-    fill_offspring(offspring1_repr, parent2, point1, point2)
-    fill_offspring(offspring2_repr, parent1, point1, point2)
+    order_fill(offspring1_repr, parent2, point2, gene_counts(offspring1_repr, parent1.size))
+    order_fill(offspring2_repr, parent1, point2, gene_counts(offspring2_repr, parent1.size))
 
-    offspring1 = Individual(teams=parent1.teams, representation=offspring1_repr)
-    offspring2 = Individual(teams=parent2.teams, representation=offspring2_repr)
+    offspring1 = make_offspring(offspring1_repr, parent1, out, 0)
+    offspring2 = make_offspring(offspring2_repr, parent1, out, 1)
     return offspring1, offspring2
 
 